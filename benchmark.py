@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark SO form, STAT plan, and MSML workbook ingestion on synthetic fixtures."""
+
+import os
+import sys
+import time
+import atexit
+import shutil
+import contextlib
+import random
+import argparse
+import tempfile
+import tracemalloc
+import pandas as pd
+import openpyxl
+
+STAGES = ["so", "read_stat_plan", "get_plans", "msml"]
+
+PREFIXES = ["CSC", "MTH", "SE", "EE", "CS", "BME", "PHL"]  # 2 letters: quarter courses
+STATUSES = ["successful", "successful", "successful", "wip", "scheduled", "NoCredit"]
+MSML_COURSES = [
+    "CSC5201",
+    "CSC5610",
+    "CSC6605",
+    "CSC6621",
+    "CSC6711",
+    "CSC7901",
+    "MTH5810",
+    "PHL6001",
+    "BUS6121",
+    "BUS6131",
+    "BUS6141",
+    "CSC5xxx",
+]
+
+
+def make_so_form(fn, rng):
+    """Write an SO assessment form with the cell layout so.get_so_data expects."""
+    # pylint: disable=import-outside-toplevel
+    from so import METADATA, LEVEL, LEVEL_ROWS, LEVEL_COLS
+
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Form"
+    values = {
+        "Program": rng.choice(["BME", "CE", "CS", "EE", "SE"]),
+        "Course Number": f"CSC {rng.randint(1000, 5999)}",
+        "Quarter/Year": rng.choice(["Fall 2023", "Spring 2024"]),
+        "Section": rng.randint(1, 9),
+        "Instructor": "Instructor Name",
+        "Outcome": f"[SO {rng.randint(1, 7)}] Outcome description",
+        "Percent Proficient": round(rng.random(), 4),
+    }
+    for field, cell in METADATA.items():
+        sheet[cell] = values[field]
+    for i, row in enumerate(LEVEL_ROWS):
+        sheet[f"{LEVEL_COLS['Level_str']}{row}"] = LEVEL[i]
+        sheet[f"{LEVEL_COLS['Level_int']}{row}"] = len(LEVEL) - i
+        sheet[f"{LEVEL_COLS['Count']}{row}"] = rng.randint(0, 15)
+    for row in range(45, 120):  # rubric text and comments below the summary
+        sheet[f"A{row}"] = f"Rubric row {row} " * 4
+    workbook.save(fn)
+
+
+def make_stat_plan(fn, rng, rows=200, student_id=1, name=("Last", "First")):
+    """Write a STAT plan: header line, then 22 tab-separated fields per course plus < / > lines."""
+    # pylint: disable=import-outside-toplevel
+    from findplan import PLAN_COLUMNS
+
+    lines = ["\t".join(PLAN_COLUMNS) + "\n", "<Plan exported for advising\n"]
+    for i in range(rows):
+        year = 2015 + i * 12 // rows
+        status = rng.choice(STATUSES) if year < 2026 else "scheduled"
+        prefix = rng.choice(PREFIXES)
+        record = dict.fromkeys(PLAN_COLUMNS, "")
+        record.update(
+            {
+                "ID": str(student_id),
+                "Year": str(year),
+                "Term": f"S{rng.randint(1, 3)}",
+                "Prefix_Number": f"{prefix:<5}{rng.randint(1000, 6999)}",
+                "Credits": str(rng.choice([1, 2, 3, 4])),
+                "Status": status,
+                "Course Name": f"Course {i}",
+                "Last Name": name[0],
+                "First Name": name[1],
+                "Major": "CS",
+                "Current Standing": "Junior",
+                "Email": f"{name[1]}.{name[0]}@msoe.edu",
+                "Advisor 1": "Advisor",
+                "Requirement": rng.choice(["Core", "Elective", ""]),
+            }
+        )
+        lines.append("\t".join(record.values()) + "\n")
+        if i % 25 == 0:
+            lines.append(">Requirement group\n")
+    with open(fn, "w", encoding="utf-8") as file:
+        file.write("".join(lines))
+
+
+def make_msml_workbook(fn, rng, students):
+    """Write an MSML-shaped master workbook with the given number of students."""
+    terms = [f"{s}S{y}" for y in range(24, 28) for s in (1, 2, 3)]
+    records = []
+    for i in range(students):
+        record = {
+            "Last Name": f"Last{i:05d}",
+            "First Name": rng.choice(["Ann", "Bo", "Cy", "Di"]),
+            "ID Number": 100000 + i,
+            "Early Entry Originally": rng.randint(0, 1),
+            "BS Complete?": rng.randint(0, 1),
+            "BS Expected": rng.choice(terms),
+            "GPA < 3": rng.randint(0, 1),
+            "HasLinearAlgebra": rng.randint(0, 1),
+            "HasMultivariableCalculus": rng.randint(0, 1),
+            "CSC5120 Needed?": rng.randint(0, 1),
+            "CSC5610 Needed?": rng.randint(0, 1),
+            "MTH5810 Needed?": bool(rng.randint(0, 1)),
+            "#≥6000 before BS": rng.randint(0, 3),
+            "# Assigned": rng.randint(6, 10),
+        }
+        for term in terms:
+            for slot in (1, 2, 3):
+                record[f"{term} C{slot}"] = (
+                    rng.choice(MSML_COURSES) if rng.random() < 0.4 else None
+                )
+        records.append(record)
+    data_frame = pd.DataFrame(records)
+    total = dict.fromkeys(data_frame.columns)
+    total.update({"Last Name": "Total", "# Assigned": data_frame["# Assigned"].sum()})
+    data_frame = pd.concat(
+        [data_frame, pd.DataFrame([dict.fromkeys(data_frame.columns), total])],
+        ignore_index=True,
+    )  # blank row, then summary row, as in the real workbook
+    data_frame.to_excel(fn, index=False)
+
+
+def measure(func, repeat):
+    """Return (best wall time in seconds, peak traced memory in bytes) for func()."""
+    best = float("inf")
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        with contextlib.redirect_stdout(devnull):  # silence progress messages
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                best = min(best, time.perf_counter() - start)
+            tracemalloc.start()  # separate run, since tracing slows execution
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return best, peak
+
+
+def bench_so(root, size, rng, repeat):
+    """Yield (variant, items, seconds, peak) for SO form extraction."""
+    # pylint: disable=import-outside-toplevel
+    import so
+
+    paths = []
+    for i in range(size):
+        paths.append(os.path.join(root, f"form{i}.xlsx"))
+        make_so_form(paths[-1], rng)
+    for variant, func in [
+        ("zip/xml", lambda p: so.read_cells_xml(p, "Form", so.FORM_CELLS)),
+        ("openpyxl", lambda p: so.read_cells_openpyxl(p, "Form", so.FORM_CELLS)),
+        ("get_so_data", so.get_so_data),
+    ]:
+        seconds, peak = measure(lambda f=func: [f(p) for p in paths], repeat)
+        yield variant, size, seconds, peak
+
+
+def bench_read_stat_plan(root, size, rng, repeat):
+    """Yield (variant, items, seconds, peak) for parsing plans of size rows."""
+    # pylint: disable=import-outside-toplevel
+    import findplan
+
+    pth = os.path.join(root, "Plan_Student.txt")
+    make_stat_plan(pth, rng, rows=size)
+    for variant, func in [
+        ("parse", lambda: findplan.parse_stat_plan(pth)),
+        ("cached", lambda: findplan.load_stat_plan(pth)),
+        ("read_stat_plan", lambda: findplan.read_stat_plan(pth, verbose=False)),
+    ]:
+        seconds, peak = measure(func, repeat)
+        yield variant, size, seconds, peak
+
+
+def bench_get_plans(root, size, rng, repeat):
+    """Yield (variant, items, seconds, peak) for finding one student among size plans."""
+    # pylint: disable=import-outside-toplevel
+    import findplan
+
+    for i in range(size):
+        folder = os.path.join(root, f"advisor{i % 10}", f"cohort{i % 7}")
+        os.makedirs(folder, exist_ok=True)
+        make_stat_plan(
+            os.path.join(folder, f"Last{i:05d}_First.txt"), rng, rows=50, student_id=i
+        )
+    name = f"Last{size // 2:05d}"
+    for variant, kwargs in [
+        ("glob", {"use_index": False}),
+        ("index", {"use_index": True}),
+    ]:
+        seconds, peak = measure(
+            lambda kw=kwargs: findplan.get_plans(name, [root], **kw), repeat
+        )
+        yield variant, size, seconds, peak
+
+
+def bench_msml(root, size, rng, repeat):
+    """Yield (variant, items, seconds, peak) for loading a workbook of size students."""
+    # pylint: disable=import-outside-toplevel
+    import msml
+
+    pth = os.path.join(root, "msml.xlsx")
+    make_msml_workbook(pth, rng, size)
+    for variant, func in [
+        ("read_excel", lambda: msml.read_master(pth)),
+        ("snapshot", lambda: msml.load_master(pth)),
+    ]:
+        seconds, peak = measure(func, repeat)
+        yield variant, size, seconds, peak
+
+
+def main(args):
+    """Generate fixtures, time each requested stage at each size, and report."""
+    benches = {
+        "so": bench_so,
+        "read_stat_plan": bench_read_stat_plan,
+        "get_plans": bench_get_plans,
+        "msml": bench_msml,
+    }
+    # Keep the user's caches out of it. The scripts close theirs at exit, and atexit
+    # runs last-registered first, so register removal before any cache is opened.
+    cache = tempfile.mkdtemp(prefix="msoe-bench-cache-")
+    atexit.register(shutil.rmtree, cache, ignore_errors=True)
+    os.environ["MSOE_CACHE_DIR"] = cache
+
+    rng = random.Random(args.seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for stage in args.stages:
+            for size in args.sizes:
+                root = os.path.join(tmp, f"{stage}-{size}")
+                os.makedirs(root)
+                for variant, items, seconds, peak in benches[stage](
+                    root, size, rng, args.repeat
+                ):
+                    results.append(
+                        {
+                            "Stage": stage,
+                            "Variant": variant,
+                            "Size": size,
+                            "Seconds": seconds,
+                            "Items/s": items / seconds,
+                            "Peak MiB": peak / 2**20,
+                        }
+                    )
+                    print(
+                        f"{stage:>15} {variant:>15} {size:>7}: {seconds:.4f} s, "
+                        f"{peak / 2**20:.1f} MiB",
+                        file=sys.stderr,
+                    )
+
+    report = pd.DataFrame(results)
+    print(report.to_string(index=False, float_format="{:.4g}".format))
+    if args.output:
+        report.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "-s",
+        "--stages",
+        type=str,
+        nargs="+",
+        choices=STAGES,
+        default=STAGES,
+        help="Stages to benchmark",
+    )
+    parser.add_argument(
+        "-n",
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000],
+        help="Fixture sizes: forms, plan rows, plan files, or students per stage",
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=3, help="Timed runs; the best is reported"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Fixture random seed")
+    parser.add_argument("-o", "--output", type=str, help="CSV file for results")
+    main(parser.parse_args())
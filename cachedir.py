@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Locate the per-user cache directory shared by these scripts."""
+
+import os
+
+
+def get_cache_dir(*parts):
+    """
+    Return (and create) a per-user cache directory, optionally a named subdirectory.
+
+    MSOE_CACHE_DIR overrides the location; otherwise LOCALAPPDATA (Windows),
+    XDG_CACHE_HOME, or ~/.cache is used as the base.
+    """
+    base = os.environ.get("MSOE_CACHE_DIR")
+    if not base:
+        base = os.path.join(
+            os.environ.get("LOCALAPPDATA")
+            or os.environ.get("XDG_CACHE_HOME")
+            or os.path.join(os.path.expanduser("~"), ".cache"),
+            "msoe",
+        )
+    pth = os.path.join(base, *parts)
+    os.makedirs(pth, exist_ok=True)
+    return pth
@@ -3,10 +3,20 @@
 
 """Fetch and parse MSOE course catalog to course links in markdown."""
 
+import os
 import re
+import sys
+import json
+import time
+import hashlib
 import argparse
+from warnings import warn
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from cachedir import get_cache_dir
 
 NAVOID = {  # map from cur_cat_oid to navoid
     40: 1392,  # UG AY25 June
@@ -14,9 +24,76 @@ NAVOID = {  # map from cur_cat_oid to navoid
     42: 1486,  # UG AY26
     43: 1542,  # GR AY26
 }
+BASE_URL = "https://catalog.msoe.edu/content.php"
+DEFAULT_WORKERS = 4  # concurrent requests; be polite to the catalog server
+DEFAULT_TTL = 24 * 60 * 60  # seconds a cached page is used without revalidation
+CACHE_VERSION = 1  # bump when parse_catalog's result changes
 
 
-def fetch_and_parse_url(base_url, course_prefix, cur_cat_oid, navoid):
+def make_session(workers=DEFAULT_WORKERS, retries=3):
+    """Return a Session pooling workers connections, retrying failed GETs with backoff."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,  # 0.5 s, 1 s, 2 s, ...
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(
+        pool_connections=workers, pool_maxsize=workers, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_catalog(content):
+    """Return (catalog title, [(course_number, course_link)]) given a catalog page."""
+    soup = BeautifulSoup(content, "html.parser")
+    catalog_title = soup.find("span", class_="acalog_catalog_name").get_text(strip=True)
+    course_links = []
+
+    for a_tag in soup.find_all("a", href=re.compile(r"^preview_course")):
+        course_number = re.split(r"\s*-\s*", a_tag["title"])[0].replace(" ", "")
+        course_link = f"https://catalog.msoe.edu/{a_tag['href'].replace('_nopop', '')}"
+        course_links.append((course_number, course_link))
+
+    return catalog_title, course_links
+
+
+def cache_path(base_url, params):
+    """Return the cache file for a request given its URL and query parameters."""
+    key = json.dumps([base_url, params, CACHE_VERSION], sort_keys=True)
+    digest = hashlib.sha224(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(get_cache_dir("catcourse"), digest + ".json")
+
+
+def load_cached(pth):
+    """Return the cache entry stored at pth, or None if there is none."""
+    try:
+        with open(pth, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached(pth, entry):
+    """Write a cache entry atomically, so concurrent readers never see a partial file."""
+    with open(f"{pth}.{os.getpid()}.tmp", "w", encoding="utf-8") as file:
+        json.dump(entry, file)
+    os.replace(f"{pth}.{os.getpid()}.tmp", pth)
+
+
+def fetch_and_parse_url(  # pylint: disable=too-many-arguments
+    base_url,
+    course_prefix,
+    cur_cat_oid,
+    navoid,
+    *,
+    session=None,
+    ttl=DEFAULT_TTL,
+    use_cache=True,
+):
     """
     Fetch the webpage and parse it for course links.
 
@@ -25,10 +102,17 @@ def fetch_and_parse_url(base_url, course_prefix, cur_cat_oid, navoid):
     course_prefix (str): The course prefix.
     cur_cat_oid (int): The cur_cat_oid parameter value.
     navoid (int): The navoid parameter value, -1 to infer from cur_cat_oid
+    session (requests.Session): Session to reuse, None for a one-off request
+    ttl (float): Seconds a cached result is used without asking the server
+    use_cache (bool): Whether to use and update the on-disk cache
 
     Returns:
     catalog title
     list of tuples: List of (course_number, course_link) tuples.
+
+    Cached results older than ttl are revalidated with a conditional GET (ETag or
+    Last-Modified), so an unchanged page costs one 304 response and no parsing.
+    If the server can't be reached, a cached result of any age is used.
     """
     if navoid == -1:
         if cur_cat_oid in NAVOID:
@@ -39,51 +123,166 @@ def fetch_and_parse_url(base_url, course_prefix, cur_cat_oid, navoid):
             )
 
     params = {"filter[27]": course_prefix, "cur_cat_oid": cur_cat_oid, "navoid": navoid}
-    response = requests.get(base_url, params=params, timeout=10)
-    response.raise_for_status()  # Ensure we notice bad responses
+    pth = cache_path(base_url, params)
+    cached = load_cached(pth) if use_cache else None
+    headers = {}
+    if cached is not None:
+        if time.time() - cached["fetched"] < ttl:
+            return cached["title"], [tuple(link) for link in cached["links"]]
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
 
-    soup = BeautifulSoup(response.content, "html.parser")
-    catalog_title = soup.find("span", class_="acalog_catalog_name").get_text(strip=True)
-    course_links = []
+    try:
+        response = (session or requests).get(
+            base_url, params=params, headers=headers, timeout=10
+        )
+    except (requests.ConnectionError, requests.Timeout) as e:
+        if cached is None:
+            raise
+        warn(f"Using cached {course_prefix} from catalog {cur_cat_oid}: {e}")
+        return cached["title"], [tuple(link) for link in cached["links"]]
 
-    for a_tag in soup.find_all("a", href=re.compile(r"^preview_course")):
-        course_number = re.split(r"\s*-\s*", a_tag["title"])[0].replace(" ", "")
-        course_link = f"https://catalog.msoe.edu/{a_tag['href'].replace('_nopop', '')}"
-        course_links.append((course_number, course_link))
+    if cached is not None and response.status_code == 304:  # Not Modified
+        catalog_title, course_links = cached["title"], cached["links"]
+    else:
+        response.raise_for_status()  # Ensure we notice bad responses
+        catalog_title, course_links = parse_catalog(response.content)
+        cached = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+    if use_cache:
+        save_cached(
+            pth,
+            {
+                **cached,
+                "fetched": time.time(),
+                "title": catalog_title,
+                "links": course_links,
+            },
+        )
 
-    return catalog_title, course_links
+    return catalog_title, [tuple(link) for link in course_links]
+
+
+def fetch_all(  # pylint: disable=too-many-arguments
+    base_url,
+    prefixes,
+    cat_oids,
+    navoid=-1,
+    *,
+    workers=DEFAULT_WORKERS,
+    retries=3,
+    ttl=DEFAULT_TTL,
+    use_cache=True,
+):
+    """
+    Return {(prefix, cur_cat_oid): (title, links) or exception} for every combination.
+
+    Requests run concurrently, at most workers at a time, over one pooled session.
+    A request that still fails after retries is reported by its exception rather
+    than stopping the others. Keys are in catalog, then prefix, order.
+    """
+    jobs = list(dict.fromkeys((prefix, oid) for oid in cat_oids for prefix in prefixes))
+
+    def fetch(job):
+        try:
+            return fetch_and_parse_url(
+                base_url, *job, navoid, session=session, ttl=ttl, use_cache=use_cache
+            )
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            return e  # AttributeError: page without a catalog title
+
+    with make_session(workers, retries) as session:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(jobs, executor.map(fetch, jobs)))
 
 
 def main():
-    """Parse arguments, parse the webpage, and print the results."""
+    """Parse arguments, parse the webpages, and print the results."""
     parser = argparse.ArgumentParser(
         description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
     parser.add_argument(
-        "-p", "--course_prefix", type=str, default="CSC", help="Course prefix"
+        "-p",
+        "--course_prefix",
+        type=str,
+        nargs="+",
+        default=["CSC"],
+        help="Course prefixes",
     )
     parser.add_argument(
         "-c",
         "--cur_cat_oid",
-        type=int,
-        default=list(NAVOID.keys())[-1],
-        help="cur_cat_oid",
+        type=str,
+        nargs="+",
+        default=[str(list(NAVOID.keys())[-1])],
+        help="cur_cat_oids, or all for every known catalog",
     )
     parser.add_argument(
         "-n", "--navoid", type=int, default=-1, help="navoid, -1 to infer"
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Maximum concurrent requests",
+    )
+    parser.add_argument(
+        "-r", "--retries", type=int, default=3, help="Retries per failed request"
+    )
+    parser.add_argument("--base_url", type=str, default=BASE_URL, help="Catalog URL")
+    parser.add_argument(
+        "--ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help="Seconds to use a cached page before revalidating it with the server",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Neither read nor write the page cache"
+    )
     args = parser.parse_args()
 
-    base_url = "https://catalog.msoe.edu/content.php"
+    if "all" in args.cur_cat_oid:
+        cat_oids = list(NAVOID.keys())
+    else:
+        cat_oids = [int(oid) for oid in args.cur_cat_oid]
+    if args.navoid != -1 and len(cat_oids) > 1:
+        parser.error("-n applies to a single catalog; omit it to infer each navoid")
 
-    catalog_title, course_links = fetch_and_parse_url(
-        base_url, args.course_prefix, args.cur_cat_oid, args.navoid
+    results = fetch_all(
+        args.base_url,
+        args.course_prefix,
+        cat_oids,
+        args.navoid,
+        workers=args.workers,
+        retries=args.retries,
+        ttl=args.ttl,
+        use_cache=not args.no_cache,
     )
 
-    print(catalog_title)
-    for course_number, course_link in course_links:
-        print(f"[{course_number}]: {course_link}")
+    failed = 0
+    last_title = None
+    for (prefix, oid), result in results.items():
+        if isinstance(result, Exception):
+            print(
+                f"Failed to fetch {prefix} from catalog {oid}: {result}",
+                file=sys.stderr,
+            )
+            failed += 1
+            continue
+        catalog_title, course_links = result
+        if catalog_title != last_title:
+            print(catalog_title)
+            last_title = catalog_title
+        for course_number, course_link in course_links:
+            print(f"[{course_number}]: {course_link}")
+
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,4 +1,6 @@
+import os
 import numpy as np
+import pandas as pd
 from scipy.stats import mode
 
 def linear_decision_boundary_classifier(decision_boundary_line_vec, training_points, training_labels, prediction_points):
@@ -41,4 +43,168 @@ def linear_decision_boundary_classifier(decision_boundary_line_vec, training_poi
     pos_mask = prediction_dot_products > 0.0
     prediction_labels[pos_mask] = pos_label
     
-    return prediction_labels
\ No newline at end of file
+    return prediction_labels
+
+
+def append_ones(points):
+    """
+    points: 2D numpy array with one point per row.
+
+    Returns a copy of points with a column of 1s appended, so that a dot product with a decision boundary vector includes its constant term.  Filling a preallocated array copies the points once.
+    """
+    augmented = np.empty((len(points), points.shape[1] + 1))
+    augmented[:, :-1] = points
+    augmented[:, -1] = 1.0
+    return augmented
+
+
+def decision_boundary_side_labels(decision_boundary_line_vecs, training_points, training_labels):
+    """
+    decision_boundary_line_vecs: 2D numpy array with one decision boundary vector per row (k x d+1), each in the form used by linear_decision_boundary_classifier.
+
+    training_points: 2D numpy array of points used to train the model (n x d).
+
+    training_labels: training labels as a 1D numpy array of length n.
+
+    Returns a (k x 2) array of the most common training label on the negative (column 0) and positive (column 1) side of each boundary.  Ties go to the smallest label, as with mode; a side with no training points gets NaN.
+    """
+    # one matrix product gives every point's signed distance (up to scale) from every boundary
+    training_dot_products = append_ones(training_points) @ decision_boundary_line_vecs.T
+
+    # count labels on each side of each boundary: (k x n) side masks times (n x c) one-hot labels
+    classes, label_codes = np.unique(training_labels, return_inverse=True)
+    one_hot = np.zeros((len(label_codes), len(classes)))
+    one_hot[np.arange(len(label_codes)), label_codes] = 1.0
+    numeric = np.issubdtype(classes.dtype, np.number)
+    side_labels = np.full((len(decision_boundary_line_vecs), 2), np.nan, dtype=float if numeric else object)
+    for side, side_mask in enumerate([training_dot_products < 0.0, training_dot_products > 0.0]):
+        counts = side_mask.T @ one_hot
+        occupied = counts.sum(axis=1) > 0
+        side_labels[occupied, side] = classes[np.argmax(counts[occupied], axis=1)]
+    return side_labels
+
+
+def predict_sides(decision_boundary_line_vecs, side_labels, prediction_points):
+    """
+    Returns a (k x m) array of labels for m prediction points given k boundaries and their side labels from decision_boundary_side_labels.  Points on a boundary get its negative side's label.
+    """
+    prediction_dot_products = append_ones(prediction_points) @ decision_boundary_line_vecs.T
+    return np.where(prediction_dot_products.T > 0.0, side_labels[:, [1]], side_labels[:, [0]])
+
+
+def linear_decision_boundaries_classifier(decision_boundary_line_vecs, training_points, training_labels, prediction_points):
+    """
+    Batched linear_decision_boundary_classifier: evaluate many candidate boundaries at once.
+
+    decision_boundary_line_vecs: 2D numpy array with one decision boundary vector per row (k x d+1).  For example, np.array([[5, -1, 2], [0.75, -1.0, -0.9]]) holds 5x - y + 2 = 0 and 0.75x - y - 0.9 = 0.
+
+    training_points, training_labels, prediction_points: as for linear_decision_boundary_classifier.
+
+    Returns a (k x m) array whose row i holds the labels that linear_decision_boundary_classifier predicts for the m prediction points given boundary i.  The ones column is appended once per set of points and all boundaries are scored with one matrix product.
+    """
+    decision_boundary_line_vecs = np.atleast_2d(decision_boundary_line_vecs)
+    side_labels = decision_boundary_side_labels(decision_boundary_line_vecs, training_points, training_labels)
+    return predict_sides(decision_boundary_line_vecs, side_labels, prediction_points)
+
+
+def load_splits(data_dir, prefix="setosa", names=("training", "validation", "testing")):
+    """
+    data_dir: directory holding the lab's <prefix>_<name>.csv files.
+
+    Returns a dictionary mapping each split name to (points, labels), where the points are every column other than "label".
+    """
+    splits = {}
+    for name in names:
+        df = pd.read_csv(os.path.join(data_dir, f"{prefix}_{name}.csv"))
+        splits[name] = (df.drop(columns="label").values, df["label"].values)
+    return splits
+
+
+def evaluate_decision_boundaries(decision_boundary_line_vecs, splits, training_split="training"):
+    """
+    decision_boundary_line_vecs: 2D numpy array with one decision boundary vector per row (k x d+1).
+
+    splits: dictionary mapping split name to (points, labels), e.g., from load_splits.  Side labels are learned from splits[training_split].
+
+    Returns (predictions, accuracy).  predictions maps each split name to its (k x m) array of predicted labels.  accuracy is a DataFrame with one row per boundary and one column per split, so, e.g., accuracy["validation"].idxmax() selects a model.
+    """
+    decision_boundary_line_vecs = np.atleast_2d(decision_boundary_line_vecs)
+    side_labels = decision_boundary_side_labels(decision_boundary_line_vecs, *splits[training_split])
+    predictions, accuracy = {}, {}
+    for name, (points, labels) in splits.items():
+        predictions[name] = predict_sides(decision_boundary_line_vecs, side_labels, points)
+        accuracy[name] = (predictions[name] == labels).mean(axis=1)
+    return predictions, pd.DataFrame(accuracy)
+
+
+def encode_labels(labels):
+    """
+    labels: 1D numpy array of labels of any type.
+
+    Returns (classes, codes): the sorted unique labels, which serve as a lookup table, and each label's integer code, so that classes[codes] equals labels.
+    """
+    classes, codes = np.unique(labels, return_inverse=True)
+    return classes, codes.astype(np.intp)
+
+
+def decode_labels(classes, codes, missing=np.nan):
+    """
+    Returns the labels for integer codes from encode_labels.  Code -1 (a side of the boundary with no training points) becomes missing.
+    """
+    dtype = float if classes.dtype.kind in "iuf" and missing is not None else object
+    table = np.append(classes.astype(dtype), missing)
+    return table[codes]  # -1 indexes the appended entry
+
+
+def _chunked_dot_products(decision_boundary_line_vec, points, chunk_size, buffer):
+    """
+    Yields (start, stop, dot products) for consecutive chunks of points.  The dot products are written into buffer, which is reused, so memory stays bounded however many points there are.
+    """
+    weights, bias = decision_boundary_line_vec[:-1], decision_boundary_line_vec[-1]
+    for start in range(0, len(points), chunk_size):
+        stop = min(start + chunk_size, len(points))
+        dot_products = buffer[:stop - start]
+        np.matmul(points[start:stop], weights, out=dot_products)  # no ones column needed
+        dot_products += bias
+        yield start, stop, dot_products
+
+
+def linear_decision_boundary_classifier_codes(decision_boundary_line_vec, training_points, training_codes, prediction_points, n_classes=None, out=None, chunk_size=65536):
+    """
+    Label-encoded linear_decision_boundary_classifier for large data sets: labels stay integer codes rather than objects.
+
+    decision_boundary_line_vec, training_points, prediction_points: as for linear_decision_boundary_classifier.
+
+    training_codes: integer codes of the training labels, e.g., from encode_labels.
+
+    n_classes: number of distinct codes; defaults to max(training_codes) + 1.
+
+    out: optional preallocated integer array of length len(prediction_points) to write the predictions into.
+
+    chunk_size: number of points whose dot products are held at once.
+
+    Returns out, holding the predicted code of each prediction point (-1 if its side of the boundary had no training points).  The majority on each side comes from np.bincount (ties go to the smallest code, as with mode); decode with decode_labels or classes[codes].  For example, with results.csv, a probability column p and 0/1 labels, boundary <1, -0.5> predicts label 1 where p > 0.5.
+    """
+    decision_boundary_line_vec = np.asarray(decision_boundary_line_vec, dtype=float)
+    training_codes = np.asarray(training_codes)
+    if n_classes is None:
+        n_classes = int(training_codes.max()) + 1
+    buffer = np.empty(min(chunk_size, max(len(training_points), len(prediction_points), 1)))
+
+    # count training codes on each side of the line, one chunk at a time
+    neg_counts = np.zeros(n_classes, dtype=np.intp)
+    pos_counts = np.zeros(n_classes, dtype=np.intp)
+    for start, stop, dot_products in _chunked_dot_products(decision_boundary_line_vec, training_points, chunk_size, buffer):
+        codes = training_codes[start:stop]
+        neg_counts += np.bincount(codes[dot_products < 0.0], minlength=n_classes)
+        pos_counts += np.bincount(codes[dot_products > 0.0], minlength=n_classes)
+    neg_code = np.argmax(neg_counts) if neg_counts.any() else -1
+    pos_code = np.argmax(pos_counts) if pos_counts.any() else -1
+
+    # points on the line go to the negative side, as in linear_decision_boundary_classifier
+    if out is None:
+        out = np.empty(len(prediction_points), dtype=np.intp)
+    for start, stop, dot_products in _chunked_dot_products(decision_boundary_line_vec, prediction_points, chunk_size, buffer):
+        out[start:stop] = neg_code
+        out[start:stop][dot_products > 0.0] = pos_code
+    return out
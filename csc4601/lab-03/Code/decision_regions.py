@@ -0,0 +1,120 @@
+import numpy as np
+
+
+def as_predict_function(predictor):
+    """
+    predictor: a function that takes a 2D numpy array of points (one per row) and returns their labels, or an object with such a predict method (e.g., a fitted scikit-learn estimator).
+
+    Returns the prediction function.  To use linear_decision_boundary_classifier, wrap it so that only the prediction points vary, e.g., lambda points: linear_decision_boundary_classifier(vec, features, labels, points).
+    """
+    return predictor.predict if hasattr(predictor, "predict") else predictor
+
+
+def predict_chunked(predictor, points, chunk_size=65536):
+    """
+    Returns the labels predicted for points, calling the predictor on at most chunk_size points at a time and writing the results into one preallocated array.
+    """
+    predict = as_predict_function(predictor)
+    labels = None
+    for start in range(0, len(points), chunk_size):
+        chunk_labels = np.asarray(predict(points[start:start + chunk_size]))
+        if labels is None:
+            labels = np.empty(len(points), dtype=chunk_labels.dtype)
+        labels[start:start + len(chunk_labels)] = chunk_labels
+    return labels
+
+
+def grid_ranges(points, margin=0.1):
+    """
+    points: 2D numpy array with two columns (features x1 and x2).
+
+    Returns ((x1 min, x1 max), (x2 min, x2 max)) covering the points, widened by margin times each span on both sides.
+    """
+    low, high = points.min(axis=0), points.max(axis=0)
+    pad = margin * (high - low)
+    return (low[0] - pad[0], high[0] + pad[0]), (low[1] - pad[1], high[1] + pad[1])
+
+
+def decision_region_grid(predictor, x_range, y_range, resolution=201, chunk_size=65536):
+    """
+    Evaluate a predictor at every point of a resolution x resolution grid.
+
+    x_range, y_range: (min, max) of each axis, e.g., from grid_ranges.
+
+    Returns (xx, yy, labels, evaluations), where xx and yy are the meshgrid coordinates, labels[i, j] is the label predicted at (xx[i, j], yy[i, j]), and evaluations is the number of points predicted.  Points are predicted in chunked, batched calls rather than one at a time.
+    """
+    xx, yy = np.meshgrid(np.linspace(*x_range, resolution), np.linspace(*y_range, resolution))
+    points = np.column_stack([xx.ravel(), yy.ravel()])
+    labels = predict_chunked(predictor, points, chunk_size).reshape(xx.shape)
+    return xx, yy, labels, points.shape[0]
+
+
+def adaptive_decision_region_grid(predictor, x_range, y_range, initial=16, levels=4, chunk_size=65536):
+    """
+    Evaluate a predictor on a fine grid, refining only cells near the decision boundary.
+
+    The grid has initial * 2**levels + 1 points per axis.  The predictor is first evaluated on the coarse grid of initial + 1 points per axis.  Each level halves the cell size: cells whose four corners have different labels are refined by evaluating their new points, while cells whose corners agree are filled with that label.  Regions narrower than a coarse cell that touch no differing corners can therefore be missed; raise initial if the classes form small islands.
+
+    Returns (xx, yy, labels, evaluations) as for decision_region_grid; evaluations is typically a small fraction of the grid size.
+    """
+    n = initial * 2**levels + 1
+    xx, yy = np.meshgrid(np.linspace(*x_range, n), np.linspace(*y_range, n))
+    evaluated = np.zeros((n, n), dtype=bool)
+    labels = None
+
+    def evaluate(mask):
+        nonlocal labels
+        new_labels = predict_chunked(predictor, np.column_stack([xx[mask], yy[mask]]), chunk_size)
+        if labels is None:
+            labels = np.empty((n, n), dtype=new_labels.dtype)
+        labels[mask] = new_labels
+        evaluated[mask] = True
+
+    step = 2**levels
+    coarse = np.zeros((n, n), dtype=bool)
+    coarse[::step, ::step] = True
+    evaluate(coarse)
+
+    while step > 1:
+        half = step // 2
+        corners = labels[::step, ::step]  # includes labels filled in at earlier levels
+        mixed = (corners[:-1, :-1] != corners[1:, :-1]) | (corners[:-1, :-1] != corners[:-1, 1:]) | (corners[:-1, :-1] != corners[1:, 1:])
+
+        # fill each uniform cell (points not yet evaluated) with its corner label
+        cell_labels = np.pad(np.repeat(np.repeat(corners[:-1, :-1], step, axis=0), step, axis=1), ((0, 1), (0, 1)), mode="edge")
+        uniform = np.pad(np.repeat(np.repeat(~mixed, step, axis=0), step, axis=1), ((0, 1), (0, 1)), mode="edge")
+        fill = uniform & ~evaluated
+        labels[fill] = cell_labels[fill]
+
+        # evaluate the new points (the 3 x 3 points at the finer spacing) of each mixed cell
+        refine = np.zeros((2 * mixed.shape[0] + 1, 2 * mixed.shape[1] + 1), dtype=bool)
+        for a in range(3):
+            for b in range(3):
+                refine[a:a + 2 * mixed.shape[0]:2, b:b + 2 * mixed.shape[1]:2] |= mixed
+        need = np.zeros((n, n), dtype=bool)
+        need[::half, ::half] = refine
+        need &= ~evaluated
+        if need.any():
+            evaluate(need)
+        step = half
+
+    return xx, yy, labels, int(evaluated.sum())
+
+
+def plot_decision_regions(xx, yy, labels, points=None, point_labels=None, ax=None, alpha=0.3, cmap="coolwarm"):
+    """
+    Shade the decision regions from decision_region_grid or adaptive_decision_region_grid, optionally with the data points colored by their labels.  matplotlib is imported only when plotting.
+
+    Returns the matplotlib Axes.
+    """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    if ax is None:
+        ax = plt.gca()
+    classes, codes = np.unique(labels, return_inverse=True)
+    vmax = max(len(classes) - 1, 1)
+    ax.pcolormesh(xx, yy, codes.reshape(labels.shape), shading="nearest", alpha=alpha, cmap=cmap, vmin=0, vmax=vmax)
+    if points is not None:
+        point_codes = np.searchsorted(classes, point_labels) if point_labels is not None else None
+        ax.scatter(points[:, 0], points[:, 1], c=point_codes, cmap=cmap, vmin=0, vmax=vmax, edgecolors="k")
+    return ax
@@ -4,14 +4,33 @@
 """Find, select, and copy to clipboard MSOE STAT advising file for a given student."""
 
 import os
+import sys
+import json
+import contextlib
+import importlib.util
+import stat
+import atexit
+import threading
+import sqlite3
 import argparse
-from glob import glob
+from glob import glob, has_magic
+from fnmatch import fnmatch
+from bisect import bisect_left
+from collections import defaultdict
 from warnings import warn
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 import numpy as np
 import pandas as pd
 import pyperclip
+from planindex import PlanIndex, DigestCache
+from cachedir import get_cache_dir
+import stagetimer
+from stagetimer import profiled
+
+DEFAULT_WORKERS = 8  # threads statting and hashing plan files concurrently
+PARTIAL_BYTES = 4096  # read from each end of a file to screen same-size duplicates
 
 
 def ranged_input(upper_end):
@@ -29,18 +48,146 @@ def ranged_input(upper_end):
             print("Invalid input. Please enter an integer.")
 
 
-def file_sha224(pth):
-    """Return last 4 characters of sha224 hash for a file; provide helpful failure diagnostics."""
-    if not os.path.isfile(pth):
+_DIGEST_CACHE = None  # False once it has failed to open
+_DIGEST_CACHE_LOCK = threading.Lock()
+
+
+def get_digest_cache():
+    """Return the shared persistent digest cache, opening it on first use, or None."""
+    global _DIGEST_CACHE  # pylint: disable=global-statement
+    with _DIGEST_CACHE_LOCK:  # hashing threads may ask for it at once
+        if _DIGEST_CACHE is None:
+            try:
+                _DIGEST_CACHE = DigestCache()
+            except sqlite3.Error as e:  # e.g., corrupt; hash every file instead
+                warn(f"Digest cache unavailable: {e}")
+                _DIGEST_CACHE = False
+            else:
+                atexit.register(_DIGEST_CACHE.close)
+    return _DIGEST_CACHE or None
+
+
+def flush_digest_cache():
+    """Commit digests cached so far, so other processes can write the cache."""
+    if _DIGEST_CACHE:
+        _DIGEST_CACHE.flush()
+
+
+@profiled("file_digest")
+def file_digest(pth, use_cache=True, st=None):
+    """
+    Return full sha224 hex digest for a file; provide helpful failure diagnostics.
+
+    Unless use_cache is false, a file whose path, size, mtime, and inode are
+    unchanged since it was last hashed is not reread. Pass st, the file's
+    os.stat result, to avoid statting it again.
+    """
+    if st is None:
+        try:
+            st = os.stat(pth)
+        except FileNotFoundError:
+            st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
         raise FileNotFoundError(f"The file {pth} does not exist.")
     if not os.access(pth, os.R_OK):
         raise PermissionError(f"The file {pth} is not readable.")
+    key = os.path.abspath(pth)
+    cache = get_digest_cache() if use_cache else None
+    if cache is not None:
+        try:
+            digest = cache.get(key, st)
+        except sqlite3.Error as e:  # e.g., locked too long; hash without it
+            warn(f"Digest cache unavailable: {e}")
+            digest, cache = None, None
+        if digest is not None:
+            stagetimer.add("file_digest", hits=1)
+            return digest
+    stagetimer.add(
+        "file_digest", misses=int(cache is not None), files=1, bytes=st.st_size
+    )
     try:
         with open(pth, "rb") as fileobj:
-            return hashlib.file_digest(fileobj, "sha224").hexdigest()[-4:]
+            digest = hashlib.file_digest(fileobj, "sha224").hexdigest()
     except Exception as e:
         # Files that appear to be readable may fail to read due to Box permission errors, etc.
         raise ValueError(f"An error occurred while processing {pth}: {str(e)}") from e
+    if cache is not None:
+        with contextlib.suppress(sqlite3.Error):  # the digest is still returned
+            cache.put(key, st, digest)
+    return digest
+
+
+def file_sha224(pth):
+    """Return last 4 characters of sha224 hash for a file."""
+    return file_digest(pth)[-4:]
+
+
+def plan_info(pth):
+    """Return (path, mtime in whole seconds, os.stat result) from one stat."""
+    st = os.stat(pth)
+    return pth, int(st.st_mtime), st
+
+
+@profiled("partial_digest")
+def partial_digest(pth, st):
+    """
+    Return sha224 hex digest of a file's first and last PARTIAL_BYTES given its os.stat.
+
+    Equal files have equal partial digests. A file no longer than both ends together
+    is hashed in full (via the digest cache), so its partial digest is its digest.
+    """
+    if st.st_size <= 2 * PARTIAL_BYTES:
+        return file_digest(pth, st=st)
+    stagetimer.add("partial_digest", files=1, bytes=2 * PARTIAL_BYTES)
+    try:
+        with open(pth, "rb") as fileobj:
+            head = fileobj.read(PARTIAL_BYTES)
+            fileobj.seek(-PARTIAL_BYTES, os.SEEK_END)
+            tail = fileobj.read(PARTIAL_BYTES)
+    except OSError as e:
+        raise ValueError(f"An error occurred while processing {pth}: {str(e)}") from e
+    return hashlib.sha224(head + tail).hexdigest()
+
+
+def thread_map(func, items, workers=DEFAULT_WORKERS):
+    """
+    Return [func(item) for item in items], using a pool of at most workers threads.
+
+    Per-item failures (e.g., Box permission errors) are raised as for a serial loop.
+    """
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+
+def collect_plan_info(found_plan, workers=DEFAULT_WORKERS):
+    """Return plan_info for each path, in order, statting in up to workers threads."""
+    return thread_map(plan_info, found_plan, workers)
+
+
+def content_keys(found, workers=DEFAULT_WORKERS):
+    """
+    Return a key per plan_info tuple that is equal exactly when file contents are.
+
+    Files are grouped by size, since a file of unique size has no duplicate and is
+    not read. Within a size, partial digests separate most files; only files that
+    still collide are hashed in full.
+    """
+    keys = [f"{st.st_size}" for _, _, st in found]
+    for stage_digest in [partial_digest, lambda pth, st: file_digest(pth, st=st)]:
+        groups = defaultdict(list)
+        for i, key in enumerate(keys):
+            groups[key].append(i)
+        colliding = [i for group in groups.values() if len(group) > 1 for i in group]
+        digests = thread_map(
+            lambda i, digest=stage_digest: digest(found[i][0], found[i][2]),
+            colliding,
+            workers,
+        )
+        for i, digest in zip(colliding, digests):
+            keys[i] = f"{found[i][2].st_size}:{digest}"
+    return keys
 
 
 def get_default_stat_paths():
@@ -65,42 +212,211 @@ def get_default_stat_paths():
     return plan_path
 
 
-def get_plans(student_name, pths=get_default_stat_paths()):
+def find_indexed_plans(student_name, pths, reindex=False):
+    """
+    Return paths of plans found via the persistent plan index.
+
+    The index is refreshed incrementally first; reindex discards it and relists everything.
+    """
+    with PlanIndex() as index:
+        if reindex:
+            index.clear()
+        index.refresh(pths)
+        return [pth for pth, _, _ in index.lookup(student_name, pths)]
+
+
+@profiled("get_plans")
+def get_plans(
+    student_name,
+    pths=get_default_stat_paths(),
+    use_index=True,
+    reindex=False,
+    workers=DEFAULT_WORKERS,
+    digest_rows=None,
+):
     """
     Return DataFrame of unique plans given student_name.
 
-    Recursively search all paths in pths. Sort with most recent mtime first.
+    Recursively search all paths in pths, via the plan index unless use_index is
+    false. Files are stat'ed and hashed by up to workers threads, but only as far
+    as needed to find duplicates (see content_keys). Sort with most recent mtime
+    first. The short sha224 is shown for only the first digest_rows rows if given.
     """
-    found_plan = []
+    existing = []
     for pth in pths:
         if os.path.isdir(pth):
-            found_plan += glob(f"{pth}/**/{student_name}*.txt", recursive=True)
+            existing.append(pth)
         else:
             warn(f"Directory not found: {pth}")
-    found_plan = [p for p in found_plan if "courseHistories" not in p]
 
+    with stagetimer.stage("find plan files"):
+        found_plan = None
+        if use_index:
+            try:
+                found_plan = find_indexed_plans(student_name, existing, reindex)
+            except sqlite3.Error as e:  # e.g., locked by another long refresh
+                warn(f"Plan index unavailable, searching directories: {e}")
+        if found_plan is None:
+            found_plan = []
+            for pth in existing:
+                found_plan += glob(f"{pth}/**/{student_name}*.txt", recursive=True)
+        found_plan = [p for p in found_plan if "courseHistories" not in p]
+    stagetimer.add("find plan files", files=len(found_plan))
+    found = collect_plan_info(found_plan, workers)
+    plans = plans_frame(found, content_keys(found, workers), digest_rows, workers)
+    flush_digest_cache()
+    return plans
+
+
+def plans_frame(found, keys, digest_rows=None, workers=DEFAULT_WORKERS):
+    """
+    Return DataFrame of unique plans, newest first, given plan_info tuples and content keys.
+
+    Only the first digest_rows rows (all if None) get a short sha224; the rest are None.
+    """
     # Create DataFrame with all plan information
     data_frame = pd.DataFrame(
         {
-            "path": found_plan,
-            "mtime": pd.to_datetime(
-                [int(os.path.getmtime(pth)) for pth in found_plan], unit="s"
-            ),
-            "sha224": ["…" + file_sha224(pth) for pth in found_plan],
+            "path": [f[0] for f in found],
+            "mtime": pd.to_datetime([f[1] for f in found], unit="s"),
+            "key": keys,
         }
     )
 
     # Filter and sort
-    data_frame = data_frame.loc[
-        data_frame.groupby("sha224")["mtime"].idxmin()
-    ]  # oldest only
+    data_frame = data_frame.loc[data_frame.groupby("key")["mtime"].idxmin()].drop(
+        columns="key"
+    )  # oldest only
     data_frame = data_frame.sort_values(
-        by=["mtime"], ascending=False, ignore_index=True
+        by=["mtime", "path"], ascending=[False, True], ignore_index=True
     )
 
+    shown = data_frame["path"].iloc[:digest_rows].tolist()
+    data_frame["sha224"] = [
+        "…" + sha for sha in thread_map(file_sha224, shown, workers)
+    ] + [None] * (len(data_frame) - len(shown))
+
     return data_frame
 
 
+@profiled("find plan files")
+def list_plan_files(pths, use_index=True, reindex=False):
+    """Return every plan path below pths from a single traversal (or index refresh)."""
+    existing = []
+    for pth in pths:
+        if os.path.isdir(pth):
+            existing.append(pth)
+        else:
+            warn(f"Directory not found: {pth}")
+
+    found_plan = None
+    if use_index:
+        try:
+            with PlanIndex() as index:
+                if reindex:
+                    index.clear()
+                index.refresh(existing)
+                found_plan = [pth for pth, _, _ in index.files_below(existing)]
+        except sqlite3.Error as e:  # e.g., locked by another long refresh
+            warn(f"Plan index unavailable, searching directories: {e}")
+    if found_plan is None:
+        found_plan = []
+        for pth in existing:
+            found_plan += glob(f"{pth}/**/*.txt", recursive=True)
+    found_plan = [p for p in found_plan if "courseHistories" not in p]
+    stagetimer.add("find plan files", files=len(found_plan))
+    return found_plan
+
+
+def match_plan_names(names, found_plan):
+    """
+    Return {name: [paths]} matching each name as a glob-style prefix of plan file names.
+
+    Plain names are resolved by binary search over the sorted file names, so the cost
+    grows with the listing size plus the number of names, not their product.
+    """
+    keyed = sorted(
+        (os.path.normcase(os.path.basename(p)), i) for i, p in enumerate(found_plan)
+    )
+    keys = [k for k, _ in keyed]
+    matches = {}
+    for name in names:
+        prefix = os.path.normcase(name)
+        if has_magic(prefix):
+            hits = [i for k, i in keyed if fnmatch(k, prefix + "*.txt")]
+        else:
+            lo = bisect_left(keys, prefix)
+            hi = bisect_left(keys, prefix + "\U0010ffff", lo)
+            hits = [i for _, i in keyed[lo:hi]]
+        matches[name] = [found_plan[i] for i in sorted(hits)]  # traversal order
+    return matches
+
+
+def resolve_batch(
+    names,
+    pths=get_default_stat_paths(),
+    use_index=True,
+    reindex=False,
+    workers=DEFAULT_WORKERS,
+):
+    """
+    Return DataFrame with the newest unique plan and its credit summary for each name.
+
+    The plan directories are traversed once and every file is hashed at most once,
+    and only if it might duplicate another.
+    Names without a plan, or with a plan that cannot be read or summarized, are kept
+    with the reason in the Error column.
+    """
+    matches = match_plan_names(names, list_plan_files(pths, use_index, reindex))
+    unique_paths = list(dict.fromkeys(p for paths in matches.values() for p in paths))
+    try:
+        found = collect_plan_info(unique_paths, workers)
+        keys = dict(zip(unique_paths, content_keys(found, workers)))
+        info = dict(zip(unique_paths, found))
+    except (OSError, ValueError):  # an unreadable plan; find it name by name below
+        info = keys = None
+
+    rows = []
+    for name, paths in matches.items():
+        row = {"Name": name, "Plans": 0}
+        rows.append(row)
+        try:
+            if info is None:
+                found = collect_plan_info(paths, workers)
+                plans = plans_frame(found, content_keys(found, workers), 1, workers)
+            else:
+                plans = plans_frame(
+                    [info[p] for p in paths], [keys[p] for p in paths], 1, workers
+                )
+            if plans.empty:
+                row["Error"] = "No plans found"
+                continue
+            row.update(Plans=len(plans), **plans.iloc[0].to_dict())
+            summary = summarize_credits(read_stat_plan(row["path"], verbose=False))
+        except (OSError, ValueError) as e:
+            row["Error"] = str(e)
+        else:
+            row.update({k: v for k, v in summary.items() if k != "by_term"})
+    flush_digest_cache()
+
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "Name",
+            "Plans",
+            "path",
+            "mtime",
+            "sha224",
+            "successful",
+            "successful_through",
+            "with_wip",
+            "wip_through",
+            "senior_standing_after",
+            "Error",
+        ],
+    )
+
+
 def extract_and_remove_fields(df, fields):
     """
     Extract fields with identical values.
@@ -148,82 +464,231 @@ STATUS_CATEGORIES = [
 ]
 
 
-def read_stat_plan(fn):
+HEADER_FIELDS = [
+    "ID",
+    "Last Name",
+    "First Name",
+    "Major",
+    "Current Standing",
+    "Email",
+    "Minor",
+    "Advisor 1",
+    "Advisor 2",
+    "UNKNOWN 1",
+    "UNKNOWN 2",
+    "UNKNOWN 3",
+    "UNKNOWN 4",
+    "UNKNOWN 5",
+    "UNKNOWN 6",
+]  # repeated on every line of a STAT plan
+
+NOT_EARNED = ["unsuccessful", "NoCredit", "missing"]
+
+SENIOR_CREDITS = 90
+
+
+PLAN_COLUMNS = [
+    "ID",
+    "Year",
+    "Term",
+    "Prefix_Number",
+    "Credits",
+    "Status",
+    "Course Name",
+    "Last Name",
+    "First Name",
+    "Major",
+    "Current Standing",
+    "Email",
+    "UNKNOWN 1",
+    "Minor",
+    "UNKNOWN 2",
+    "UNKNOWN 3",
+    "UNKNOWN 4",
+    "Advisor 1",
+    "Advisor 2",
+    "UNKNOWN 5",
+    "UNKNOWN 6",
+    "Requirement",
+]  # tab-separated fields of each STAT plan line
+
+
+class PlanLineFilter:
     """
-    Return DataFrame & calculate credits completed & WIP given STAT plan path.
+    Text stream of a STAT plan's course lines, for read_csv.
 
-    Doesn't include unsuccessful, NoCredit, or missing courses. Calculates
-    semester credits and raises an error if various sequenece rules are violated
-    (e.g., a course is planned in a past semester).
+    read_csv supports 1 comment character, but we have 2, so "<" and ">" lines are
+    skipped while reading, as is the column header line. The HEADER_FIELDS of each
+    course line are checked against the first course line on the fly, so they
+    never need to be parsed into columns.
     """
-    # read_csv supports 1 comment character, but we have 2, so preprocess:
-    with open(fn, "r", encoding="utf-8") as file:
-        filtered_lines = [
-            line for line in file if not line.strip().startswith(("<", ">"))
-        ]
-    buffer = StringIO("".join(filtered_lines))  # convert to file-like object
-
-    plan = pd.read_csv(
-        buffer,
-        sep="\t",
-        skiprows=1,
-        index_col=["Year", "Term"],
-        names=[
-            "ID",
-            "Year",
-            "Term",
-            "Prefix_Number",
-            "Credits",
-            "Status",
-            "Course Name",
-            "Last Name",
-            "First Name",
-            "Major",
-            "Current Standing",
-            "Email",
-            "UNKNOWN 1",
-            "Minor",
-            "UNKNOWN 2",
-            "UNKNOWN 3",
-            "UNKNOWN 4",
-            "Advisor 1",
-            "Advisor 2",
-            "UNKNOWN 5",
-            "UNKNOWN 6",
-            "Requirement",
-        ],
-        dtype={
-            "Status": "category",
-            **{f: "string" for f in ["Prefix_Number", "Course Name", "Requirement"]},
-        },
+
+    def __init__(self, file):
+        self._lines = self._course_lines(file)
+        self._pending = []
+        self._pending_len = 0
+        self.first_line = None
+
+    def _course_lines(self, file):
+        positions = [PLAN_COLUMNS.index(f) for f in HEADER_FIELDS]
+        header_skipped = False
+        for line in file:
+            if line.strip().startswith(("<", ">")):
+                continue
+            if not header_skipped:
+                header_skipped = True
+                continue
+            if not line.strip():
+                continue  # read_csv skips blank lines
+            values = line.rstrip("\r\n").split("\t")
+            values += [""] * (len(PLAN_COLUMNS) - len(values))
+            values = [values[i] for i in positions]
+            if self.first_line is None:
+                self.first_line, first_values = line, values
+            elif values != first_values:
+                for field, value, first_value in zip(
+                    HEADER_FIELDS, values, first_values
+                ):
+                    if value != first_value:
+                        raise ValueError(
+                            f"Field '{field}' does not have identical values for "
+                            "every record."
+                        )
+            yield line
+
+    def read(self, size=-1):
+        """Return up to size characters (all remaining if size < 0)."""
+        if size is None or size < 0:
+            size = float("inf")
+        while self._pending_len < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._pending.append(line)
+            self._pending_len += len(line)
+        text = "".join(self._pending)
+        if size < len(text):
+            text, rest = text[:size], text[size:]
+            self._pending, self._pending_len = [rest], len(rest)
+        else:
+            self._pending, self._pending_len = [], 0
+        return text
+
+    def __iter__(self):
+        if self._pending:  # partially read text first
+            yield "".join(self._pending)
+            self._pending, self._pending_len = [], 0
+        yield from self._lines
+
+    def header_values(self):
+        """Return {field: value} of HEADER_FIELDS parsed from the first course line."""
+        if self.first_line is None:
+            raise ValueError(
+                f"Field '{HEADER_FIELDS[0]}' does not have identical values for every record."
+            )
+        first = pd.read_csv(
+            StringIO(self.first_line),
+            sep="\t",
+            header=None,
+            names=PLAN_COLUMNS,
+            usecols=HEADER_FIELDS,
+        )
+        return {field: first[field].iloc[0] for field in HEADER_FIELDS}
+
+
+PLAN_CACHE_VERSION = 1  # bump whenever parse_stat_plan's output changes
+PLAN_CACHE_BYTES = 100 * 2**20  # least recently used parsed plans evicted beyond this
+
+
+def plan_cache_path(digest):
+    """Return path of the cached parse of a plan with the given sha224 digest."""
+    return os.path.join(
+        get_cache_dir("plans"), f"{digest}-v{PLAN_CACHE_VERSION}.parquet"
     )
 
+
+def evict_plan_cache(max_bytes=PLAN_CACHE_BYTES):
+    """Remove cached parses from other parser versions, then the least recently used."""
+    entries = []
+    with os.scandir(get_cache_dir("plans")) as it:
+        for entry in it:
+            if entry.name.endswith(f"-v{PLAN_CACHE_VERSION}.parquet"):
+                st = entry.stat()
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+            else:
+                with contextlib.suppress(OSError):
+                    os.remove(entry.path)
+    total = sum(size for _, size, _ in entries)
+    for _, size, pth in sorted(entries):
+        if total <= max_bytes:
+            break
+        with contextlib.suppress(OSError):  # another process may have removed it
+            os.remove(pth)
+            total -= size
+
+
+def load_stat_plan(fn, use_cache=True):
+    """
+    Return (header fields, DataFrame of every course) given STAT plan path.
+
+    Parses are cached as Parquet keyed by the file's sha224, so an unchanged plan
+    skips parsing and validation. Caching is skipped if pyarrow is unavailable.
+    """
+    if not use_cache or importlib.util.find_spec("pyarrow") is None:
+        return parse_stat_plan(fn)
+
+    cache_path = plan_cache_path(file_digest(fn))
+    try:
+        plan = pd.read_parquet(cache_path)
+        os.utime(cache_path)  # mark as recently used
+        stagetimer.add("parse_stat_plan", hits=1)
+        return json.loads(plan.attrs.pop("stat_fields")), plan
+    except (OSError, KeyError):
+        stagetimer.add("parse_stat_plan", misses=1)  # not cached (or unreadable)
+
+    fields, plan = parse_stat_plan(fn)
+    plan.attrs["stat_fields"] = json.dumps(fields, default=lambda v: v.item())
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    plan.to_parquet(tmp_path)
+    os.replace(tmp_path, cache_path)  # readers never see a partial file
+    del plan.attrs["stat_fields"]
+    evict_plan_cache()
+    return fields, plan
+
+
+@profiled("parse_stat_plan")
+def parse_stat_plan(fn):
+    """
+    Return (header fields, DataFrame of every course) given STAT plan path.
+
+    The header fields must have identical values on every line and are not kept in
+    the DataFrame. The file is streamed and only the course columns are parsed.
+    Courses are sorted by term, then prefix and number.
+    """
+    stagetimer.add("parse_stat_plan", files=1, bytes=os.path.getsize(fn))
+    with open(fn, "r", encoding="utf-8") as file:
+        lines = PlanLineFilter(file)
+        plan = pd.read_csv(
+            lines,
+            sep="\t",
+            header=None,
+            index_col=["Year", "Term"],
+            names=PLAN_COLUMNS,
+            usecols=[c for c in PLAN_COLUMNS if c not in HEADER_FIELDS],
+            dtype={
+                "Status": "category",
+                **{
+                    f: "string" for f in ["Prefix_Number", "Course Name", "Requirement"]
+                },
+            },
+        )
+    fields = lines.header_values()
+
     plan["Status"] = pd.Categorical(plan["Status"], categories=STATUS_CATEGORIES)
     extra_values = set(plan["Status"].unique()) - set(STATUS_CATEGORIES)
     if extra_values:  # set not empty, nan indicates something couldn't convert
         raise ValueError("Unrecognized Status category")  # too late to find nan source
 
-    _, plan = extract_and_remove_fields(
-        plan,
-        [
-            "ID",
-            "Last Name",
-            "First Name",
-            "Major",
-            "Current Standing",
-            "Email",
-            "Minor",
-            "Advisor 1",
-            "Advisor 2",
-            "UNKNOWN 1",
-            "UNKNOWN 2",
-            "UNKNOWN 3",
-            "UNKNOWN 4",
-            "UNKNOWN 5",
-            "UNKNOWN 6",
-        ],
-    )
-
     # Break course number into parts
     plan["Prefix"] = plan["Prefix_Number"].str[:5].str.rstrip()
     plan["Number"] = plan["Prefix_Number"].str[5:]
@@ -231,40 +696,106 @@ def read_stat_plan(fn):
     plan = plan.sort_values(["Prefix", "Number"])  # 1st since less significant
     plan = plan.sort_index(level=["Year", "Term"])
 
-    # Convert everything to semester credits
-    plan["SemCredits"] = plan.apply(
-        lambda row: (
-            row["Credits"]
-            if len(row["Prefix"]) == 3
-            else (2 / 3) * row["Credits"] if len(row["Prefix"]) == 2 else np.nan
-        ),
-        axis=1,
+    return fields, plan
+
+
+def add_sem_credits(plan):
+    """
+    Add SemCredits column converting Credits to semester credits, in place.
+
+    3-letter prefixes are semester courses; 2-letter prefixes are quarter courses
+    worth 2/3 as much. Other prefix lengths get NaN. Works on any number of plans.
+    """
+    prefix_len = plan["Prefix"].str.len().to_numpy(dtype=float, na_value=np.nan)
+    plan["SemCredits"] = plan["Credits"] * np.select(
+        [prefix_len == 3, prefix_len == 2], [1.0, 2 / 3], np.nan
     )
+    return plan
 
-    plan = plan[
-        ~plan["Status"].isin(["unsuccessful", "NoCredit", "missing"])
-    ]  # not earned credits
 
-    for k in ["Credits", "SemCredits"]:
+def downcast_whole(plan, fields=("Credits", "SemCredits")):
+    """Convert each credit field to int32, in place, if all of its values are whole."""
+    for k in fields:
         if np.all(plan[k] % 1 == 0):
             plan[k] = plan[k].astype("int32")
+    return plan
 
-    idx, sem_credits, last_term = {}, {}, {}
-    for k in ["successful", "wip"]:
-        idx[k] = plan["Status"] == k
-        sem_credits[k] = plan.loc[idx[k], "SemCredits"].sum()
-        last_term[k] = sem_tup_str(plan[idx[k]].index[-1]) if any(idx[k]) else None
 
-    print(
-        f"{sem_credits['successful']:.2f} credits are complete as of {last_term['successful']}"
+@profiled("read_stat_plan")
+def read_stat_plan(fn, verbose=True):
+    """
+    Return DataFrame & calculate credits completed & WIP given STAT plan path.
+
+    Doesn't include unsuccessful, NoCredit, or missing courses. Calculates
+    semester credits and raises an error if various sequenece rules are violated
+    (e.g., a course is planned in a past semester). Prints a credit summary if verbose.
+    """
+    _, plan = load_stat_plan(fn)
+    plan = add_sem_credits(plan)
+    plan = downcast_whole(plan[~plan["Status"].isin(NOT_EARNED)].copy())
+
+    if verbose:
+        print_credit_summary(summarize_credits(plan))
+
+    return plan
+
+
+def read_stat_plans(paths):
+    """
+    Return tidy DataFrame of earned credits per student ID and term given STAT plan paths.
+
+    Columns: ID, Year, Term, Credits, SemCredits, and cumulative TotalSemCredits.
+    Pass one plan per student (e.g., from get_plans or resolve_batch); plans with the
+    same ID are pooled. Plans are concatenated before any credit computation, so the
+    work is vectorized across the whole cohort.
+    """
+    if not paths:
+        return pd.DataFrame(
+            columns=["ID", "Year", "Term", "Credits", "SemCredits", "TotalSemCredits"]
+        )
+    plans = []
+    for fn in paths:
+        fields, plan = load_stat_plan(fn)
+        plans.append(plan.assign(ID=fields["ID"]).reset_index())
+    plans = pd.concat(plans, ignore_index=True)
+    plans = add_sem_credits(plans)
+    plans = plans[~plans["Status"].isin(NOT_EARNED)]
+
+    term_credits = (
+        plans.groupby(["ID", "Year", "Term"])[["Credits", "SemCredits"]]
+        .sum()
+        .reset_index()
     )
-    if sem_credits["wip"] > 0:
-        print(
-            f"{sem_credits['successful']+sem_credits['wip']:.2f} credits will be complete "
-            f"with successful WIP through {last_term['wip']}"
+    term_credits["TotalSemCredits"] = term_credits.groupby("ID")["SemCredits"].cumsum()
+    return term_credits
+
+
+def senior_standing_terms(term_credits):
+    """Return first (Year, Term) per ID reaching senior standing given read_stat_plans output."""
+    senior = term_credits[term_credits["TotalSemCredits"] >= SENIOR_CREDITS]
+    return senior.groupby("ID")[["Year", "Term"]].first()
+
+
+@profiled("summarize_credits")
+def summarize_credits(plan):
+    """
+    Return dictionary of semester credits earned, given a plan from read_stat_plan.
+
+    Keys: successful and with_wip credits, the last term of each (*_through), the
+    per-term totals (by_term), and the term after which senior standing is reached.
+    """
+    terms = plan.index.to_frame(index=False).assign(
+        Status=plan["Status"].to_numpy(), SemCredits=plan["SemCredits"].to_numpy()
+    )
+    by_status = terms.groupby("Status", observed=True)
+    status_credits = by_status["SemCredits"].sum()
+    status_last = by_status[["Year", "Term"]].last()
+    sem_credits, last_term = {}, {}
+    for k in ["successful", "wip"]:
+        sem_credits[k] = status_credits.get(k, 0)
+        last_term[k] = (
+            sem_tup_str(status_last.loc[k].tolist()) if k in status_last.index else None
         )
-    else:
-        print("There is no WIP.")
 
     earned_credits_term = (
         plan.groupby(["Year", "Term"])
@@ -272,21 +803,91 @@ def read_stat_plan(fn):
         .reset_index()
     )
     earned_credits_term["TotalSemCredits"] = earned_credits_term["SemCredits"].cumsum()
-    print(earned_credits_term.to_string(index=False))
-    if sem_credits["wip"] < 90:
-        senior_terms = earned_credits_term[earned_credits_term["TotalSemCredits"] >= 90]
+    senior_standing_after = None
+    if sem_credits["wip"] < SENIOR_CREDITS:
+        senior_terms = earned_credits_term[
+            earned_credits_term["TotalSemCredits"] >= SENIOR_CREDITS
+        ]
         if not senior_terms.empty:
-            print(
-                "Senior standing will be reached after "
-                f"{sem_tup_str(senior_terms.iloc[0][['Year', 'Term']].tolist())}"
+            senior_standing_after = sem_tup_str(
+                senior_terms.iloc[0][["Year", "Term"]].tolist()
             )
 
-    return plan
+    return {
+        "successful": sem_credits["successful"],
+        "successful_through": last_term["successful"],
+        "with_wip": sem_credits["successful"] + sem_credits["wip"],
+        "wip_through": last_term["wip"],
+        "by_term": earned_credits_term,
+        "senior_standing_after": senior_standing_after,
+    }
+
+
+def print_credit_summary(summary):
+    """Print the credit summary returned by summarize_credits."""
+    print(
+        f"{summary['successful']:.2f} credits are complete as of "
+        f"{summary['successful_through']}"
+    )
+    if summary["with_wip"] > summary["successful"]:
+        print(
+            f"{summary['with_wip']:.2f} credits will be complete "
+            f"with successful WIP through {summary['wip_through']}"
+        )
+    else:
+        print("There is no WIP.")
+
+    print(summary["by_term"].to_string(index=False))
+    if summary["senior_standing_after"] is not None:
+        print(
+            f"Senior standing will be reached after {summary['senior_standing_after']}"
+        )
+
+
+def read_names(fn):
+    """Return student names, one per line, from a file or stdin ("-"); skip blanks and #."""
+    with open(fn, "r", encoding="utf-8") if fn != "-" else sys.stdin as file:
+        names = [line.strip() for line in file]
+    return [n for n in names if n and not n.startswith("#")]
+
+
+def write_table(data_frame, fn):
+    """Write a DataFrame as XLSX if fn ends with .xlsx, else as CSV."""
+    if fn.lower().endswith(".xlsx"):
+        data_frame.to_excel(fn, index=False, freeze_panes=(1, 0))
+    else:
+        data_frame.to_csv(fn, index=False)
+
+
+def batch_main(args):
+    """Resolve the plans of every student listed in args.batch and write one table."""
+    data_frame = resolve_batch(
+        read_names(args.batch),
+        args.directory,
+        use_index=not args.no_index,
+        reindex=args.reindex,
+        workers=args.workers,
+    )
+    if args.output:
+        write_table(data_frame, args.output)
+        print(f"{len(data_frame)} students written to {args.output}")
+    else:
+        pd.options.display.max_colwidth = None
+        print(data_frame.to_string(index=False))
+    return 0
 
 
 def main(args):
     """Find matching advising plans, copy user selection to clipboard."""
-    data_frame = get_plans(args.name, args.directory)
+    if args.batch:
+        return batch_main(args)
+    data_frame = get_plans(
+        args.name,
+        args.directory,
+        use_index=not args.no_index,
+        reindex=args.reindex,
+        workers=args.workers,
+    )
 
     if data_frame.empty:
         print("No plans found, exiting...")
@@ -309,20 +910,24 @@ def main(args):
     return 0
 
 
-if __name__ == "__main__":
-    # execute only if run as a script
+def cli():
+    """Parse command line arguments and run main, timing stages if requested."""
     parser = argparse.ArgumentParser(
         description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
     parser.add_argument(
-        "name", type=str, help="LastName | LastName_FirstInit | LastName_FirstName"
+        "name",
+        type=str,
+        nargs="?",
+        help="LastName | LastName_FirstInit | LastName_FirstName",
     )
     parser.add_argument(
         "-d",
         "--directory",
         type=str,
-        default=get_default_stat_paths(),
-        help="Directories to search",
+        nargs=1,
+        action="extend",
+        help="Directory to search, repeat for several; None searches the STAT folders",
     )
     parser.add_argument(
         "-n", "--no-summary", action="store_true", help="Don't summarize plan"
@@ -330,4 +935,46 @@ if __name__ == "__main__":
     parser.add_argument(
         "-c", "--choose", action="store_true", help="Choose plan interactively"
     )
-    main(parser.parse_args())
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Threads for statting and hashing plan files",
+    )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        type=str,
+        help="File of names, one per line (- for stdin), to resolve in one pass",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="Batch results file (.csv or .xlsx); printed if omitted",
+    )
+    index_group = parser.add_mutually_exclusive_group()
+    index_group.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Rebuild the persistent plan index before searching",
+    )
+    index_group.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Search directories directly instead of using the plan index",
+    )
+    stagetimer.add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.name is None and args.batch is None:
+        parser.error("a name is required unless --batch is given")
+    if args.directory is None:
+        args.directory = get_default_stat_paths()
+    with stagetimer.session(args.profile):
+        return main(args)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    cli()
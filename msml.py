@@ -12,16 +12,23 @@ Given the XLSX master file for MSML course planning, do one of the following.
 
 import os
 import re
+import time
+import json
+import hashlib
 from io import StringIO
 import argparse
 import shutil
 import contextlib
-import tempfile
+import glob
 import pprint
+from collections import deque
 import numpy as np
 import pandas as pd
 import pyperclip
 from findplan import get_plans, read_stat_plan
+from cachedir import get_cache_dir
+import stagetimer
+from stagetimer import profiled
 
 
 def check_file_accessibility(filename):
@@ -33,31 +40,100 @@ def check_file_accessibility(filename):
         return False
 
 
+def clone_file(source_path, dest_path):
+    """
+    Copy a file's contents, sharing its blocks (copy-on-write) where supported.
+
+    FICLONE works on Btrfs, XFS, and similar; otherwise shutil.copyfile uses the
+    platform's fast path (sendfile on Linux, fcopyfile on macOS).
+    """
+    try:
+        import fcntl  # pylint: disable=import-outside-toplevel
+
+        with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+            fcntl.ioctl(
+                dst.fileno(), getattr(fcntl, "FICLONE", 0x40049409), src.fileno()
+            )
+        return
+    except (ImportError, OSError):
+        pass  # not POSIX, or no reflink support between these files
+    shutil.copyfile(source_path, dest_path)
+
+
+def snapshot_path(source_path, st):
+    """Return the local snapshot path of source_path given its os.stat result."""
+    key = hashlib.sha224(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:16]
+    ext = os.path.splitext(source_path)[1]  # keep, so readers can infer the format
+    return os.path.join(
+        get_cache_dir("snapshots"), f"{key}-{st.st_size}-{st.st_mtime_ns}{ext}"
+    )
+
+
+def remove_old_snapshots(snapshot):
+    """Remove snapshots of the same source at other sizes/mtimes, leaving copies in progress."""
+    folder, name = os.path.split(snapshot)
+    key = name.partition("-")[0]
+    for old in glob.glob(os.path.join(glob.escape(folder), key + "-*")):
+        if old != snapshot and ".tmp" not in os.path.basename(old):
+            with contextlib.suppress(OSError):  # e.g., still open in another run
+                os.remove(old)
+
+
 @contextlib.contextmanager
 def safe_file_access(source_path):
-    """Context manager to access file with fallback to temporary copy if the original is locked."""
-    temp_file_used = False
-    temp_file_path = None
+    """
+    Context manager to access file with fallback to a local snapshot if the original is locked.
+
+    The snapshot is named by the source's path, size, and mtime, so it is copied only
+    when the source changes and is shared by concurrent runs; each copy is published
+    by an atomic rename. If that rename fails (e.g., another run holds the old snapshot
+    open on Windows), this run uses its private copy and removes it afterward.
+    """
+    start = time.perf_counter()
 
     if check_file_accessibility(source_path):
         print("File is accessible for reading.")
+        stagetimer.add("safe_file_access", calls=1, seconds=time.perf_counter() - start)
         yield source_path
+        return
+
+    print("File is not accessible. Assuming OneDrive lock.")
+    st = os.stat(source_path)
+    snapshot = snapshot_path(source_path, st)
+    private_copy = None
+    if os.path.exists(snapshot):
+        print(f"Using local snapshot {snapshot}")
+        stagetimer.add("safe_file_access", hits=1)
     else:
-        print("File is not accessible. Assuming OneDrive lock.")
+        stem, ext = os.path.splitext(snapshot)
+        temp_file_path = f"{stem}.{os.getpid()}.tmp{ext}"
         try:
-            fd, temp_file_path = tempfile.mkstemp()  # Create a temporary file
-            os.close(fd)  # Close the file descriptor, copy2 will open it again
-            shutil.copy2(source_path, temp_file_path)
-            print(f"Local copy created at {temp_file_path} due to file lock.")
-            temp_file_used = True
-            yield temp_file_path
-        except IOError:
+            clone_file(source_path, temp_file_path)
+        except OSError:
             print("Error while creating a local copy.")
+            with contextlib.suppress(OSError):
+                os.remove(temp_file_path)
             raise  # re-raise, fatal error
+        stagetimer.add("safe_file_access", misses=1, files=1, bytes=st.st_size)
+        now = os.stat(source_path)
+        try:
+            if (now.st_size, now.st_mtime_ns) != (st.st_size, st.st_mtime_ns):
+                raise OSError("source changed while copying")  # don't publish
+            os.replace(temp_file_path, snapshot)
+        except OSError:
+            private_copy = snapshot = temp_file_path
+            print(f"Local copy created at {snapshot} due to file lock.")
+        else:
+            print(f"Local snapshot created at {snapshot} due to file lock.")
+            remove_old_snapshots(snapshot)
+    stagetimer.add("safe_file_access", calls=1, seconds=time.perf_counter() - start)
 
-    if temp_file_used:  # Cleanup if temporary file was used
-        os.remove(temp_file_path)
-        print("Temporary local copy removed successfully.")
+    try:
+        yield snapshot
+    finally:
+        if private_copy is not None:
+            os.remove(private_copy)
+            print("Temporary local copy removed successfully.")
 
 
 TERMS = {1: "Fall", 2: "Spring", 3: "Summer"}
@@ -109,6 +185,63 @@ def make_electives_unique(li):
             li[i] = crs + " " + str(j)
 
 
+APPROVED_ELECTIVES = {"BUS6141"}  # don't fit into course number logic
+
+
+def is_elective(crs):
+    """Return true if a planned course can meet a CSC5xxx elective requirement."""
+    return crs in APPROVED_ELECTIVES or (
+        crs.startswith(("BME", "CSC")) and crs[3].isdigit() and int(crs[3]) >= 5
+    )
+
+
+class PlannedCourses:
+    """
+    Multiset of planned courses that keeps plan order, for requirement matching.
+
+    Membership, removal of a course's first remaining occurrence, and finding the
+    first remaining elective take amortized constant time instead of list scans.
+    """
+
+    def __init__(self, courses):
+        self.courses = courses
+        self.positions = {}  # course -> positions not yet removed, in plan order
+        for i, crs in enumerate(courses):
+            self.positions.setdefault(crs, deque()).append(i)
+        self.removed = set()
+        self.electives = deque(i for i, crs in enumerate(courses) if is_elective(crs))
+
+    def __contains__(self, crs):
+        return bool(self.positions.get(crs))
+
+    def remove(self, crs):
+        """Remove the first remaining occurrence of crs."""
+        self.removed.add(self.positions[crs].popleft())
+
+    def remove_all(self, crs):
+        """Remove every remaining occurrence of crs."""
+        self.removed.update(self.positions.pop(crs, ()))
+
+    def first_elective(self):
+        """Return the first remaining course that can meet an elective, else None."""
+        while self.electives and self.electives[0] in self.removed:
+            self.electives.popleft()
+        return self.courses[self.electives[0]] if self.electives else None
+
+    def __iter__(self):
+        return (c for i, c in enumerate(self.courses) if i not in self.removed)
+
+
+def match_csc5610_bus(requirements, planned, reqs):
+    """Special case CSC5610, which can also be met by BUS6121+BUS6131."""
+    csc5610bus = ["BUS6121", "BUS6131"]
+    if "CSC5610" in requirements and all(opt in planned for opt in csc5610bus):
+        reqs["CSC5610"] = csc5610bus
+        requirements.remove("CSC5610")
+        for opt in csc5610bus:
+            planned.remove_all(opt)
+
+
 def get_requirements(class_list, need_csc5610, need_mth5810):
     """
     Provide a reconciliation of how and whether the degree requirements are met.
@@ -124,8 +257,8 @@ def get_requirements(class_list, need_csc5610, need_mth5810):
     requirements.append("MTH5810" if need_mth5810 else "CSC5xxx")
     make_electives_unique(requirements)
 
-    # Flatten the lists of classes into a single list
-    planned = [s for sublist in class_list.values() for s in sublist]
+    # Flatten the lists of classes into a single multiset
+    planned = PlannedCourses([s for sublist in class_list.values() for s in sublist])
 
     reqs = {}
 
@@ -137,42 +270,80 @@ def get_requirements(class_list, need_csc5610, need_mth5810):
             planned.remove(opt)
             break
 
-    # Special case CSC5610, which can also be met by BUS6121+BUS6131
-    csc5610bus = ["BUS6121", "BUS6131"]
-    if "CSC5610" in requirements and all(opt in planned for opt in csc5610bus):
-        reqs["CSC5610"] = csc5610bus
-        requirements.remove("CSC5610")
-        planned = [x for x in planned if x not in csc5610bus]
+    match_csc5610_bus(requirements, planned, reqs)
 
-    electives = [
-        "BUS6141"
-    ]  # Approved electives that don't fit into course number logic
-    for crs in requirements.copy():
+    unplanned = []
+    for crs in requirements:
         if crs.startswith("CSC5xxx"):
-            for opt in planned:
-                if (opt in electives) or (
-                    opt.startswith(("BME", "CSC"))
-                    and opt[3].isdigit()
-                    and int(opt[3]) >= 5
-                ):
-                    reqs[crs] = opt
-                    requirements.remove(crs)
-                    planned.remove(opt)
-                    break
+            opt = planned.first_elective()
         else:
-            if crs in planned:
-                reqs[crs] = crs
-                requirements.remove(crs)
-                planned.remove(crs)
-    for crs in requirements:  # no plan to meet remaining requirements
+            opt = crs if crs in planned else None
+        if opt is None:
+            unplanned.append(crs)
+        else:
+            reqs[crs] = opt
+            planned.remove(opt)
+    for crs in unplanned:  # no plan to meet remaining requirements
         reqs[crs] = "unplanned"
-    ex = 0
-    for opt in planned:  # remaining planned courses don't meet a requirement
-        ex = ex + 1
+    for ex, opt in enumerate(planned, start=1):
+        # remaining planned courses don't meet a requirement
         reqs["Extra course " + str(ex)] = opt
     return reqs
 
 
+@profiled("audit_cohort")
+def audit_cohort(df):
+    """
+    Return the requirements reconciliation of every student in the master DataFrame.
+
+    One row per student with the unmet requirements and extra courses, matching
+    what summarize_student reports for each student individually.
+    """
+    course_cols = [
+        (j, semester_code_to_string(m.group(1)))
+        for j, col in enumerate(df.columns)
+        if (m := re.match(r"^(\dS\d{2}) ", col))
+    ]
+    courses = df.iloc[:, [j for j, _ in course_cols]].to_numpy(dtype=object)
+    present = pd.notna(courses)
+    needs = df[["CSC5610 Needed?", "MTH5810 Needed?"]].fillna(False).to_numpy(bool)
+
+    rows = []
+    for i, last_name in enumerate(df.index):
+        class_list = {}
+        for k, (_, label) in enumerate(course_cols):
+            if present[i, k]:
+                class_list.setdefault(label, []).append(courses[i, k])
+        reqs = get_requirements(class_list, *needs[i])
+        unmet = [crs for crs, opt in reqs.items() if opt == "unplanned"]
+        extra = [opt for crs, opt in reqs.items() if crs.startswith("Extra course")]
+        rows.append(
+            {
+                "Last Name": last_name,
+                "First Name": df["First Name"].iloc[i],
+                "Unmet": ", ".join(unmet),
+                "Extra": ", ".join(extra),
+                "# Unmet": len(unmet),
+                "# Extra": len(extra),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+@profiled("summarize_audit")
+def summarize_audit(args, df):
+    """Audit requirements for every student; write to args.output or print."""
+    audit = audit_cohort(df)
+    if args.output:
+        audit.to_excel(
+            args.output, index=False, sheet_name="Audit", freeze_panes=(1, 0)
+        )
+        print(f"Audit of {audit.shape[0]} students written to {args.output}")
+    else:
+        print(audit.to_string(index=False))
+    return 0
+
+
 def extract_grad_plan(plan):
     """Given a DataFrame with the student's entire STAT plan, extract the graduate portion."""
     grad_plan = plan[
@@ -184,6 +355,7 @@ def extract_grad_plan(plan):
     return grad_plan
 
 
+@profiled("summarize_student")
 def summarize_student(args, df):
     """Find a specified student and summarize their record."""
     [ln, _, fn] = args.name.partition("_")
@@ -212,8 +384,8 @@ def summarize_student(args, df):
 
     print("\nSearching for STAT Plan:")
     plans = get_plans(
-        "_".join([record.name, record["First Name"]])
-    )  # restrict beyond args.name
+        "_".join([record.name, record["First Name"]]), digest_rows=1
+    )  # restrict beyond args.name; only the newest plan is shown
     if plans.empty:
         print("None found")
     else:
@@ -227,29 +399,60 @@ def summarize_student(args, df):
     return 0
 
 
-def summarize_course(args, df):
+def term_sort_key(code):
+    """Return key sorting term codes chronologically (academic year, then semester)."""
+    return int(code[2:]), int(code[0])
+
+
+@profiled("build_enrollments")
+def build_enrollments(df):
+    """
+    Return long-format enrollment index, one row per planned course, given master DataFrame.
+
+    Columns: Row (position in df), Last Name, First Name, Term, Year, Semester, Slot,
+    and Course. Rows are ordered by term/slot column, then by student.
+    """
+    cols = df.columns[df.columns.str.contains(r"\dS\d{2} C\d")]
+    enrollments = (
+        df[["First Name", *cols]]
+        .reset_index(names="Last Name")
+        .reset_index(names="Row")
+        .melt(
+            id_vars=["Row", "Last Name", "First Name"],
+            value_vars=cols,
+            var_name="Column",
+            value_name="Course",
+        )
+        .dropna(subset=["Course"])
+    )
+    parts = enrollments.pop("Column").str.extract(r"^((\d)S(\d{2})) C(\d)")
+    enrollments.insert(3, "Term", parts[0])
+    enrollments.insert(4, "Year", parts[2])
+    enrollments.insert(5, "Semester", parts[1])
+    enrollments.insert(6, "Slot", parts[3].astype(int))
+    return enrollments.reset_index(drop=True)
+
+
+def enrollment_counts(enrollments):
+    """Return Course × Term table of planned seats for every course and term."""
+    counts = (
+        enrollments.groupby(["Course", "Term"]).size().unstack("Term", fill_value=0)
+    )
+    return counts[sorted(counts.columns, key=term_sort_key)]
+
+
+@profiled("summarize_course")
+def summarize_course(args, df, enrollments=None):
     """Given a course code, list MSML students planning to take it."""
-    results = []
-
-    # Iterate over columns containing each semester's course selections
-    for col in df.columns[df.columns.str.contains(r"\dS\d{2} C\d")]:
-        # Check if any cell in the column contains the course code
-        matching_rows = df[df[col].astype(str).str.contains(args.name, na=False)]
-        term = col.split(" ", 1)[0]
-        # Append the results list with student name and term details
-        for _, row in matching_rows.iterrows():
-            results.append(
-                {
-                    "Last Name": row.name,
-                    "First Name": row["First Name"],
-                    "Year": term[2:],
-                    "Semester": term[0],
-                }
-            )
+    if enrollments is None:
+        enrollments = build_enrollments(df)
+    matched = enrollments[
+        enrollments["Course"].astype(str).str.contains(args.name, na=False)
+    ]
 
-    if results:
+    if not matched.empty:
         cols = ["Year", "Semester", "Last Name", "First Name"]
-        enrolled = pd.DataFrame(results, columns=cols).sort_values(cols)
+        enrolled = matched[cols].sort_values(cols)
         print(enrolled.to_string(index=False))
 
         # Copy to clipboard for easy pasting to Excel
@@ -268,26 +471,76 @@ def summarize_course(args, df):
     return 0
 
 
-def summarize_term(args, df):
-    """Given a term, list courses scheduled to run and students in each course."""
-    results = []
-
-    # Iterate over each column in the given term
-    for col in [f"{args.name} C{i}" for i in range(1, 4)]:
-        matching_rows = df[df[col].notna()]
-        for _, row in matching_rows.iterrows():
-            results.append(
-                {
-                    "Last Name": row.name,
-                    "First Name": row["First Name"],
-                    "Course": row[col],
-                    "BS Complete?": row["BS Complete?"],
-                    "BS Expected": row["BS Expected"],
-                }
+def term_roster(df, enrollments, term):
+    """Return students in each course of a term (slots C1-C3), sorted by course and name."""
+    in_term = enrollments[
+        (enrollments["Term"] == term) & enrollments["Slot"].between(1, 3)
+    ]
+    roster = in_term[["Last Name", "First Name", "Course"]].assign(
+        **{
+            k: df[k].iloc[in_term["Row"]].to_numpy()
+            for k in ["BS Complete?", "BS Expected"]
+        }
+    )
+    return roster.sort_values(by=["Course", "Last Name", "First Name"])
+
+
+def seat_demand(enrollments):
+    """
+    Return Course × Term tables of seat counts and of the students filling each seat.
+
+    Counts come from enrollment_counts; student lists are "First Last" names
+    separated by "; ".
+    """
+    counts = enrollment_counts(enrollments)
+    full_name = (  # either part of a name may be missing
+        enrollments["First Name"].fillna("").astype(str)
+        + " "
+        + enrollments["Last Name"].fillna("").astype(str)
+    ).str.strip()
+    students = (
+        enrollments.assign(**{"Full Name": full_name})
+        .sort_values(["Last Name", "First Name"])
+        .groupby(["Course", "Term"])["Full Name"]
+        .agg("; ".join)
+        .unstack("Term", fill_value="")[counts.columns]
+    )
+    return counts, students
+
+
+@profiled("summarize_demand")
+def summarize_demand(args, df, enrollments=None):
+    """Write course × term seat demand, student lists, and term rosters to one XLSX."""
+    if enrollments is None:
+        enrollments = build_enrollments(df)
+    counts, students = seat_demand(enrollments)
+    fn = args.output or "demand.xlsx"
+
+    with pd.ExcelWriter(fn) as writer:
+        counts.assign(Total=counts.sum(axis=1)).to_excel(
+            writer, sheet_name="Demand", freeze_panes=(1, 1)
+        )
+        students.to_excel(writer, sheet_name="Students", freeze_panes=(1, 1))
+        for term in counts.columns:
+            term_roster(df, enrollments, term).to_excel(
+                writer, index=False, sheet_name=term, freeze_panes=(1, 0)
             )
 
-    grouped = pd.DataFrame(results)
-    grouped.sort_values(by=["Course", "Last Name", "First Name"], inplace=True)
+    print(counts.to_string())
+    print(f"Seat demand for {counts.shape[0]} courses written to {fn}")
+    return 0
+
+
+@profiled("summarize_term")
+def summarize_term(args, df, enrollments=None):
+    """Given a term, list courses scheduled to run and students in each course."""
+    if enrollments is None:
+        enrollments = build_enrollments(df)
+    grouped = term_roster(df, enrollments, args.name)
+    if grouped.empty:
+        print(f"Term not found: [{args.name}]")
+        return 0
+
     grouped.to_excel(
         args.name + ".xlsx", index=False, sheet_name=args.name, freeze_panes=(1, 0)
     )
@@ -301,8 +554,11 @@ def summarize_term(args, df):
     return 0
 
 
-def main(args):
-    """Perform actions requested by command line arguments."""
+SNAPSHOT_VERSION = 1  # bump whenever read_master's output changes
+
+
+def read_master(file):
+    """Read the MSML master workbook and keep only the enrolled students' records."""
     # See https://github.com/pandas-dev/pandas/issues/45903 re loading bool as uint8
     boolean_fields = [
         "Early Entry Originally",
@@ -316,7 +572,10 @@ def main(args):
     # "MTH5810 Needed?" is detected as boolean; adding it to the above list causes conversion error
     int32_fields = ["ID Number", "#≥6000 before BS", "# Assigned"]
 
-    with safe_file_access(args.file) as accessible_file_path:
+    with safe_file_access(file) as accessible_file_path, stagetimer.stage("read_excel"):
+        stagetimer.add(
+            "read_excel", files=1, bytes=os.path.getsize(accessible_file_path)
+        )
         df = pd.read_excel(
             accessible_file_path,
             index_col=0,
@@ -339,16 +598,130 @@ def main(args):
         # Otherwise use the length of the DataFrame (e.g., if summary later removed)
         pass
 
+    return df
+
+
+@profiled("load_master")
+def load_master(file, refresh=False):
+    """
+    Return the cleaned master DataFrame, from a local snapshot when possible.
+
+    The snapshot is a typed Parquet file (pickle if a column can't be stored as
+    Parquet) reused while the workbook's size and mtime are unchanged. refresh
+    forces the workbook to be read again.
+    """
+    st = os.stat(file)
+    source = {
+        "path": os.path.abspath(file),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "version": SNAPSHOT_VERSION,
+    }
+    stem = os.path.join(
+        get_cache_dir("msml"),
+        hashlib.sha224(source["path"].encode("utf-8")).hexdigest()[:16],
+    )
+
+    if not refresh:
+        try:
+            with open(stem + ".json", "r", encoding="utf-8") as fileobj:
+                meta = json.load(fileobj)
+            if meta["source"] == source:
+                stagetimer.add("load_master", hits=1)
+                if meta["format"] == "parquet":
+                    df = pd.read_parquet(f"{stem}.parquet")
+                    obj = df.select_dtypes("object").columns  # None → NaN as read_excel
+                    df[obj] = df[obj].where(df[obj].notna(), np.nan)
+                    return df
+                return pd.read_pickle(f"{stem}.pkl")
+        except (OSError, ValueError, KeyError):
+            pass  # no usable snapshot
+
+    stagetimer.add("load_master", misses=1)
+    df = read_master(file)
+
+    try:
+        df.to_parquet(f"{stem}.parquet.tmp")
+        fmt = "parquet"
+    except (ImportError, ValueError, TypeError):  # no pyarrow, or mixed-type column
+        df.to_pickle(f"{stem}.pkl.tmp")
+        fmt = "pkl"
+    os.replace(f"{stem}.{fmt}.tmp", f"{stem}.{fmt}")
+    with open(stem + ".json.tmp", "w", encoding="utf-8") as fileobj:
+        json.dump({"source": source, "format": fmt}, fileobj)
+    os.replace(stem + ".json.tmp", stem + ".json")
+    print(f"Snapshot of {file} saved")
+
+    return df
+
+
+def dispatch(args, df, enrollments=None):
+    """Summarize the course, term, or student named by args.name."""
     if is_course_code(args.name):
-        return summarize_course(args, df)
+        return summarize_course(args, df, enrollments)
     if is_term_code(args.name):
-        return summarize_term(args, df)
+        return summarize_term(args, df, enrollments)
     return summarize_student(args, df)
 
 
-if __name__ == "__main__":
-    # execute only if run as a script
+def interactive(args, df):
+    """Answer queries, one per input line, without reloading the master file."""
+    enrollments = build_enrollments(df)
+    print(
+        "Enter a student name, course code, or term code; 'audit' checks every "
+        "student; 'reload' rereads the file if it changed; 'quit' exits."
+    )
+    while True:
+        try:
+            line = input("msml> ").strip()
+        except EOFError:
+            break
+        if not line:
+            continue
+        if line in ("quit", "exit"):
+            break
+        if line == "audit":
+            summarize_audit(argparse.Namespace(output=None), df)
+            continue
+        if line == "reload":
+            df = load_master(args.file)
+            enrollments = build_enrollments(df)
+            print(f"{df.shape[0]} student records loaded")
+            continue
+        try:
+            dispatch(
+                argparse.Namespace(**{**vars(args), "name": line}), df, enrollments
+            )
+        except (
+            KeyError,
+            ValueError,
+            OSError,
+            re.error,  # course codes are matched as regular expressions
+            pyperclip.PyperclipException,
+        ) as e:  # report and keep the session alive
+            print(f"Error for {line}: {e!r}")
+    return 0
+
+
+def main(args):
+    """Perform actions requested by command line arguments."""
+    if args.name is None and not (args.interactive or args.audit or args.demand):
+        print("A name, course code, or term code is required unless -i, -a, or -s")
+        return -1
+
+    df = load_master(args.file, refresh=args.refresh)
+
+    if args.audit:
+        return summarize_audit(args, df)
+    if args.demand:
+        return summarize_demand(args, df)
+    if args.interactive:
+        return interactive(args, df)
+    return dispatch(args, df)
 
+
+def cli():
+    """Parse command line arguments and run main, timing stages if requested."""
     data_path = [
         "OneDrive - Milwaukee School of Engineering",
         "MSML Admin",
@@ -361,6 +734,7 @@ if __name__ == "__main__":
     parser.add_argument(
         "name",
         type=str,
+        nargs="?",
         help="LastName (if unique) | LastName_FirstName | CourseCode | TermCode",
     )
     parser.add_argument(
@@ -370,4 +744,42 @@ if __name__ == "__main__":
         default=os.path.join(os.path.expanduser("~"), *data_path),
         help="File to analyze",
     )
-    main(parser.parse_args())
+    parser.add_argument(
+        "-r",
+        "--refresh",
+        action="store_true",
+        help="Reread the file instead of using its local snapshot",
+    )
+    parser.add_argument(
+        "-i",
+        "--interactive",
+        action="store_true",
+        help="Load the file once, then answer queries typed one per line",
+    )
+    parser.add_argument(
+        "-a",
+        "--audit",
+        action="store_true",
+        help="Check requirements for every student",
+    )
+    parser.add_argument(
+        "-s",
+        "--demand",
+        action="store_true",
+        help="Write seat demand for every course and term (default demand.xlsx)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="XLSX file for audit or seat demand results",
+    )
+    stagetimer.add_profile_argument(parser)
+    args = parser.parse_args()
+    with stagetimer.session(args.profile):
+        return main(args)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    cli()
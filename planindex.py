@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Persistent SQLite index of STAT plan files and cache of their digests."""
+
+import os
+import sqlite3
+import time
+import threading
+from warnings import warn
+from cachedir import get_cache_dir
+
+PLAN_SUFFIX = ".txt"
+COMMIT_SECONDS = 0.5  # longest a refresh keeps the index locked between commits
+DIGEST_CACHE_SIZE = 20_000  # entries kept before least recently used are evicted
+DIGEST_BATCH_SIZE = 256  # puts per commit and eviction pass
+
+
+class SQLiteIndex:
+    """
+    Base for an index kept in a SQLite database, by default in the cache directory.
+
+    Subclasses name their database file in DB_NAME and create their tables in
+    _create_tables, which runs whenever the stored user_version is not
+    SCHEMA_VERSION, so an index written by an older version is rebuilt.
+    """
+
+    DB_NAME = None
+    SCHEMA_VERSION = 0
+
+    def __init__(self, db_path=None):
+        if db_path is None:
+            db_path = os.path.join(get_cache_dir(), self.DB_NAME)
+        self.con = sqlite3.connect(db_path)
+        self._init_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Commit pending changes and close the database."""
+        try:
+            self.con.commit()
+        finally:
+            self.con.close()
+
+    def _init_schema(self):
+        """Create tables, discarding any index written by a different schema version."""
+        version = self.con.execute("PRAGMA user_version").fetchone()[0]
+        if version == self.SCHEMA_VERSION:
+            return
+        self._create_tables()
+        self.con.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self.con.commit()
+
+    def _create_tables(self):
+        """Drop any existing tables and create empty ones."""
+        raise NotImplementedError
+
+
+class PlanIndex(SQLiteIndex):
+    """
+    Index of every plan file (path, size, mtime) below a set of root directories.
+
+    A directory is only relisted when its mtime differs from the indexed value, so
+    a refresh of an unchanged tree costs one stat per directory rather than a full
+    recursive glob. Name lookups are prefix GLOB queries answered from an index.
+
+    A refresh commits at least every COMMIT_SECONDS, so other processes can use
+    the index meanwhile. Each directory is committed together with placeholder
+    rows for its new subdirectories, so a refresh that trusts an unchanged
+    directory still visits children not yet listed.
+    """
+
+    DB_NAME = "planindex.sqlite3"
+    SCHEMA_VERSION = 2  # bump when the tables below change
+
+    def _create_tables(self):
+        self.con.executescript("""
+            DROP TABLE IF EXISTS dirs;
+            DROP TABLE IF EXISTS files;
+            CREATE TABLE dirs (
+                path TEXT PRIMARY KEY,
+                parent TEXT,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE INDEX dirs_parent ON dirs(parent);
+            CREATE TABLE files (
+                path TEXT PRIMARY KEY,
+                dir TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE INDEX files_name ON files(name);
+            CREATE INDEX files_dir ON files(dir);
+            """)
+
+    def clear(self):
+        """Forget everything so that the next refresh relists every directory."""
+        self.con.execute("DELETE FROM dirs")
+        self.con.execute("DELETE FROM files")
+
+    def _begin_write(self):
+        """
+        Start a write transaction unless one is open, waiting for other writers.
+
+        Taking the write lock up front avoids failing with "database is locked",
+        without waiting, when a transaction that has only read so far starts writing.
+        """
+        if not self.con.in_transaction:
+            self.con.execute("BEGIN IMMEDIATE")
+
+    def _forget_dir(self, pth):
+        """Remove a directory and everything indexed below it."""
+        self._begin_write()
+        stack = [pth]
+        while stack:
+            pth = stack.pop()
+            stack.extend(
+                row[0]
+                for row in self.con.execute(
+                    "SELECT path FROM dirs WHERE parent = ?", (pth,)
+                )
+            )
+            self.con.execute("DELETE FROM files WHERE dir = ?", (pth,))
+            self.con.execute("DELETE FROM dirs WHERE path = ?", (pth,))
+
+    def _relist_dir(self, pth, parent, mtime_ns):
+        """Rescan one directory's entries, updating its files; return its subdirectories."""
+        subdirs, files = [], {}
+        with os.scandir(pth) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue  # glob's ** and * skip hidden entries
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                elif entry.is_file() and os.path.normcase(entry.name).endswith(
+                    PLAN_SUFFIX
+                ):
+                    st = entry.stat()
+                    files[entry.path] = (entry.name, st.st_size, st.st_mtime_ns)
+
+        self._begin_write()
+        for (old,) in self.con.execute(
+            "SELECT path FROM dirs WHERE parent = ?", (pth,)
+        ).fetchall():
+            if old not in subdirs:
+                self._forget_dir(old)
+        self.con.executemany(  # mtime -1: not listed yet
+            "INSERT OR IGNORE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, -1)",
+            [(d, pth) for d in subdirs],
+        )
+
+        indexed = {
+            row[0]: row[1:]
+            for row in self.con.execute(
+                "SELECT path, size, mtime_ns FROM files WHERE dir = ?", (pth,)
+            )
+        }
+        self.con.executemany(
+            "DELETE FROM files WHERE path = ?",
+            [(p,) for p in indexed.keys() - files.keys()],
+        )
+        self.con.executemany(
+            "INSERT OR REPLACE INTO files (path, dir, name, size, mtime_ns) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (p, pth, os.path.normcase(name), size, mtime_ns)
+                for p, (name, size, mtime_ns) in files.items()
+                if indexed.get(p) != (size, mtime_ns)
+            ],
+        )
+        self.con.execute(
+            "INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+            (pth, parent, mtime_ns),
+        )
+        return subdirs
+
+    def refresh(self, roots):
+        """Bring the index up to date for each root, relisting only changed directories."""
+        committed = time.monotonic()
+        for root in roots:
+            stack = [(os.path.normpath(root), None)]
+            while stack:
+                pth, parent = stack.pop()
+                try:
+                    mtime_ns = os.stat(pth).st_mtime_ns
+                except OSError:
+                    self._forget_dir(pth)
+                    continue
+                row = self.con.execute(
+                    "SELECT mtime_ns FROM dirs WHERE path = ?", (pth,)
+                ).fetchone()
+                if row is not None and row[0] == mtime_ns:
+                    subdirs = [
+                        r[0]
+                        for r in self.con.execute(
+                            "SELECT path FROM dirs WHERE parent = ?", (pth,)
+                        )
+                    ]
+                else:
+                    try:
+                        subdirs = self._relist_dir(pth, parent, mtime_ns)
+                    except OSError:
+                        self._forget_dir(pth)
+                        continue
+                    if time.monotonic() - committed >= COMMIT_SECONDS:
+                        self.con.commit()
+                        committed = time.monotonic()
+                stack.extend((d, pth) for d in subdirs)
+        self.con.commit()
+
+    def lookup(self, student_name, roots):
+        """
+        Return [(path, size, mtime_ns)] for plans named student_name* below roots.
+
+        Like glob, student_name may itself contain wildcards. In-place edits do not
+        change a directory's mtime, so matches are re-stat'ed.
+        """
+        pattern = os.path.normcase(student_name) + "*" + PLAN_SUFFIX
+        found = []
+        for root in roots:
+            found += self.con.execute(
+                "SELECT path, size, mtime_ns FROM files "
+                "WHERE name GLOB ? AND path >= ? AND path < ? ORDER BY path",
+                (pattern, *_path_range(root)),
+            ).fetchall()
+
+        current = []
+        for pth, size, mtime_ns in found:
+            try:
+                st = os.stat(pth)
+            except OSError:
+                self.con.execute("DELETE FROM files WHERE path = ?", (pth,))
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                size, mtime_ns = st.st_size, st.st_mtime_ns
+                self.con.execute(
+                    "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                    (size, mtime_ns, pth),
+                )
+            current.append((pth, size, mtime_ns))
+        self.con.commit()
+        return current
+
+    def files_below(self, roots):
+        """Return [(path, size, mtime_ns)] for every indexed plan below roots."""
+        found = []
+        for root in roots:
+            found += self.con.execute(
+                "SELECT path, size, mtime_ns FROM files "
+                "WHERE path >= ? AND path < ? ORDER BY path",
+                _path_range(root),
+            ).fetchall()
+        return found
+
+
+def _path_range(root):
+    """Return (lower, upper) bounds of the paths strictly below root."""
+    root = os.path.join(os.path.normpath(root), "")  # trailing separator
+    return root, root[:-1] + chr(ord(root[-1]) + 1)
+
+
+class DigestCache:
+    """
+    Persistent LRU cache of file digests keyed by (path, size, mtime_ns, inode).
+
+    A file whose key is unchanged is never reread. At most max_entries digests are
+    kept; the least recently used are evicted. New digests and use times are held
+    in memory and written in one short transaction, which also evicts excess
+    entries, once per batch_size of them and on flush or close. So the database is
+    not kept locked while files are hashed. Safe to share between threads.
+    """
+
+    def __init__(
+        self, db_path=None, max_entries=DIGEST_CACHE_SIZE, batch_size=DIGEST_BATCH_SIZE
+    ):
+        if db_path is None:
+            db_path = os.path.join(get_cache_dir(), "digests.sqlite3")
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.con = sqlite3.connect(db_path, check_same_thread=False)
+        self.con.executescript("""
+            CREATE TABLE IF NOT EXISTS digests (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                last_used INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS digests_last_used ON digests(last_used);
+            """)
+        self._clock, self._entries = self.con.execute(
+            "SELECT COALESCE(MAX(last_used), 0), COUNT(*) FROM digests"
+        ).fetchone()
+        self._new = {}  # path: (size, mtime_ns, inode, digest, last_used) to write
+        self._used = {}  # path: last_used to write for cached digests
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def get(self, pth, st):
+        """Return the cached digest for pth given its os.stat result, or None on a miss."""
+        key = (st.st_size, st.st_mtime_ns, st.st_ino)
+        with self._lock:
+            if pth in self._new and self._new[pth][:3] == key:
+                self.hits += 1
+                self._new[pth] = (*key, self._new[pth][3], self._tick())
+                return self._new[pth][3]
+            row = self.con.execute(
+                "SELECT digest FROM digests "
+                "WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?",
+                (pth, *key),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used[pth] = self._tick()
+            self._commit_batch_if_full()
+            return row[0]
+
+    def put(self, pth, st, digest):
+        """Store the digest computed for pth when it had the given os.stat result."""
+        with self._lock:
+            self._new[pth] = (
+                st.st_size,
+                st.st_mtime_ns,
+                st.st_ino,
+                digest,
+                self._tick(),
+            )
+            self._used.pop(pth, None)
+            self._commit_batch_if_full()
+
+    def flush(self):
+        """Write pending digests and use times now rather than at the end of the batch."""
+        with self._lock:
+            self._commit_batch()
+
+    def _commit_batch_if_full(self):
+        if len(self._new) + len(self._used) >= self.batch_size:
+            self._commit_batch()
+
+    def _commit_batch(self):
+        """
+        Write pending digests and use times, evict excess entries, and commit.
+
+        If the database can't be written (e.g., another process holds it locked),
+        the pending writes are dropped with a warning; they only save rehashing.
+        """
+        new, used = self._new, self._used
+        self._new, self._used = {}, {}
+        if not new and not used:
+            return
+        inserted = 0
+        try:
+            self.con.executemany(
+                "UPDATE digests SET last_used = ? WHERE path = ?",
+                [(last_used, pth) for pth, last_used in used.items()],
+            )
+            for pth, values in new.items():
+                if not self.con.execute(
+                    "UPDATE digests SET size = ?, mtime_ns = ?, inode = ?, "
+                    "digest = ?, last_used = ? WHERE path = ?",
+                    (*values, pth),
+                ).rowcount:
+                    self.con.execute(
+                        "INSERT INTO digests "
+                        "(size, mtime_ns, inode, digest, last_used, path) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (*values, pth),
+                    )
+                    inserted += 1
+            excess = max(self._entries + inserted - self.max_entries, 0)
+            if excess:
+                self.con.execute(
+                    "DELETE FROM digests WHERE path IN "
+                    "(SELECT path FROM digests ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+            self.con.commit()
+        except sqlite3.Error as e:
+            self.con.rollback()
+            warn(f"Digest cache not updated: {e}")
+        else:
+            self._entries += inserted - excess
+
+    def stats(self):
+        """Return hit and miss counts since this cache was opened."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        """Write pending digests and use times and close the database."""
+        with self._lock:
+            self._commit_batch()
+            self.con.close()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Search the slide text of PowerPoint decks, via a persistent incremental index."""
+
+import os
+import re
+import sys
+import sqlite3
+import zipfile
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from planindex import SQLiteIndex
+import stagetimer
+from stagetimer import profiled
+
+SLIDE_PART = re.compile(r"ppt/slides/slide(\d+)\.xml")
+NS_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+
+def slide_texts(pth):
+    """
+    Return [(slide number, text)] for a deck, reading slide XML from the zip in memory.
+
+    Text has one line per non-empty paragraph (text boxes, placeholders, tables).
+    Slide numbers come from the part names, as PowerPoint writes them.
+    """
+    slides = []
+    with zipfile.ZipFile(pth) as deck:
+        for name in deck.namelist():
+            match = SLIDE_PART.fullmatch(name)
+            if not match:
+                continue
+            root = ET.fromstring(deck.read(name))
+            lines = []
+            for para in root.iter(f"{NS_A}p"):
+                line = "".join(t.text or "" for t in para.iter(f"{NS_A}t")).strip()
+                if line:
+                    lines.append(line)
+            slides.append((int(match.group(1)), "\n".join(lines)))
+    return sorted(slides)
+
+
+def read_deck(pth):
+    """Return (pth, slide_texts or None if the deck can't be read, error message)."""
+    try:
+        return pth, slide_texts(pth), None
+    except (OSError, zipfile.BadZipFile, ET.ParseError) as e:
+        return pth, None, str(e)
+
+
+def find_decks(directory, recursive=False):
+    """Return paths of .pptx files in directory, skipping PowerPoint's ~$ lock files."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(os.path.abspath(directory)):
+        found += [
+            os.path.join(dirpath, fn)
+            for fn in filenames
+            if fn.lower().endswith(".pptx") and not fn.startswith("~$")
+        ]
+        if not recursive:
+            dirnames.clear()
+    return sorted(found)
+
+
+class SlideIndex(SQLiteIndex):
+    """
+    Index of slide text keyed by deck path, size, and mtime.
+
+    Only new or changed decks are reread on update. Text is held in an FTS5 table
+    with the trigram tokenizer where SQLite supports it, so substring searches use
+    the index; otherwise a plain table is scanned.
+    """
+
+    DB_NAME = "pptx_search.sqlite3"
+    SCHEMA_VERSION = 1  # bump when the tables or extracted text change
+
+    def _create_tables(self):
+        self.con.executescript("""
+            DROP TABLE IF EXISTS decks;
+            DROP TABLE IF EXISTS slides;
+            CREATE TABLE decks (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            """)
+        try:
+            self.con.execute(
+                "CREATE VIRTUAL TABLE slides USING fts5"
+                "(deck UNINDEXED, slide UNINDEXED, text, tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:  # SQLite without FTS5 or trigram (< 3.34)
+            self.con.execute(
+                "CREATE TABLE slides (deck TEXT NOT NULL, slide INTEGER, text TEXT)"
+            )
+
+    def clear(self):
+        """Forget everything so that the next update rereads every deck."""
+        self.con.execute("DELETE FROM decks")
+        self.con.execute("DELETE FROM slides")
+
+    @profiled("update index")
+    def update(self, paths, workers=None):
+        """Bring the index up to date for paths, rereading only new or changed decks."""
+        indexed = {
+            row[0]: row[1:]
+            for row in self.con.execute("SELECT path, size, mtime_ns FROM decks")
+        }
+        stale = {}
+        for pth in paths:
+            st = os.stat(pth)
+            if indexed.get(pth) != (st.st_size, st.st_mtime_ns):
+                stale[pth] = (st.st_size, st.st_mtime_ns)
+        stagetimer.add(
+            "update index",
+            files=len(stale),
+            bytes=sum(size for size, _ in stale.values()),
+            hits=len(paths) - len(stale),
+            misses=len(stale),
+        )
+        if not stale:
+            return
+
+        print(f"Indexing {len(stale)} of {len(paths)} decks", file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for pth, slides, error in executor.map(read_deck, stale, chunksize=4):
+                self.con.execute("DELETE FROM slides WHERE deck = ?", (pth,))
+                # a deck that can't be read is indexed without slides, so it is
+                # not retried until it changes
+                if slides is None:
+                    print(f"Skipping {pth}: {error}", file=sys.stderr)
+                else:
+                    self.con.executemany(
+                        "INSERT INTO slides (deck, slide, text) VALUES (?, ?, ?)",
+                        [(pth, number, text) for number, text in slides],
+                    )
+                self.con.execute(
+                    "INSERT OR REPLACE INTO decks (path, size, mtime_ns) VALUES (?, ?, ?)",
+                    (pth, *stale[pth]),
+                )
+        self.con.commit()
+
+    def forget_missing(self):
+        """Remove decks that no longer exist."""
+        for (pth,) in self.con.execute("SELECT path FROM decks").fetchall():
+            if not os.path.exists(pth):
+                self.con.execute("DELETE FROM slides WHERE deck = ?", (pth,))
+                self.con.execute("DELETE FROM decks WHERE path = ?", (pth,))
+        self.con.commit()
+
+    @profiled("search")
+    def search(self, terms, paths):
+        """
+        Return [(deck, slide, text)] for slides of paths containing every term (any case).
+
+        Only terms of at least 3 characters without % or _ go into the SQL query, as
+        LIKE patterns the trigram index can answer. (SQLite 3.40 crashes when a
+        shorter term precedes another in such a query.) Every term is then checked
+        as a plain substring of the candidate slides.
+
+        >>> index = SlideIndex(":memory:")
+        >>> _ = index.con.execute(
+        ...     "INSERT INTO slides VALUES ('d', 1, 'AI and gradient descent')"
+        ... )
+        >>> index.search(["AI", "descent"], ["d"])
+        [('d', 1, 'AI and gradient descent')]
+        """
+        indexed = [t for t in terms if len(t) >= 3 and not set(t) & set("%_")]
+        query = "SELECT deck, slide, text FROM slides"
+        if indexed:
+            query += " WHERE " + " AND ".join(["text LIKE ?"] * len(indexed))
+        lowered = [term.lower() for term in terms]
+        wanted = set(paths)
+        return sorted(
+            (deck, int(slide), text)
+            for deck, slide, text in self.con.execute(
+                query, [f"%{term}%" for term in indexed]
+            )
+            if deck in wanted and all(t in text.lower() for t in lowered)
+        )
+
+
+def context_lines(text, terms, context=1):
+    """Return the lines of text matching any term, with context lines around each."""
+    lines = text.split("\n")
+    hits = [i for i, line in enumerate(lines) if any(t in line.lower() for t in terms)]
+    keep = sorted(
+        {
+            j
+            for i in hits
+            for j in range(max(0, i - context), min(len(lines), i + context + 1))
+        }
+    )
+    return [lines[j] for j in keep]
+
+
+def main(args):
+    """Index the decks in args.directory as needed, then print matching slides."""
+    decks = find_decks(args.directory, args.recursive)
+    if not decks:
+        print(f"No .pptx files in {args.directory}")
+        return 1
+
+    with SlideIndex() as index:
+        if args.reindex:
+            index.clear()
+        index.forget_missing()
+        index.update(decks, args.workers)
+        results = index.search(args.terms, decks)
+
+    terms = [term.lower() for term in args.terms]
+    for deck, slide, text in results:
+        print(f"Found in {os.path.relpath(deck, args.directory)} - Slide {slide}")
+        for line in context_lines(text, terms, args.context):
+            print(f"  {line}")
+        print()
+    print(f"{len(results)} slides in {len(set(r[0] for r in results))} decks")
+    return 0 if results else 1
+
+
+def cli():
+    """Parse command line arguments and run main, timing stages if requested."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "terms", type=str, nargs="+", help="Text that every matching slide contains"
+    )
+    parser.add_argument(
+        "-d", "--directory", type=str, default=".", help="Directory of decks"
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true", help="Include subdirectories"
+    )
+    parser.add_argument(
+        "-C", "--context", type=int, default=1, help="Lines of context around matches"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes reading decks (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--reindex", action="store_true", help="Reread every deck instead of reusing"
+    )
+    stagetimer.add_profile_argument(parser)
+    args = parser.parse_args()
+    with stagetimer.session(args.profile):
+        return main(args)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    sys.exit(cli())
@@ -3,22 +3,31 @@
 
 """Summarize MSOE EECS SO XLSX files recursively."""
 
-# TODO: order by outcome number, course number, section
-
-# TODO: Add columns (N>=pro,N) to summarize as required by process.
-
 # TODO: Format row bands per outcome
 
 # TODO: Year should default to current AY
 
-# TODO: Select year range
-
 import os
 import re
+import json
 import argparse
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
 import pandas as pd
 import openpyxl
+from openpyxl.styles.numbers import (
+    BUILTIN_FORMATS,
+    is_date_format,
+    is_timedelta_format,
+)
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+from openpyxl.utils.datetime import from_excel, MAC_EPOCH, WINDOWS_EPOCH
+from cachedir import get_cache_dir
+import stagetimer
+from stagetimer import profiled
 
 TIME_TAG = datetime.now().strftime(
     "%G%m%dT%H%M%S"
@@ -44,20 +53,203 @@ OUTCOME_NUMBER = [
 ]
 
 
-def get_so_data(full_path):
-    """Read summary SO assessment data from the given XLSX file."""
-    level_rows = [24, 28, 32, 36, 40]
-    level_cols = {"Level_str": "D", "Level_int": "F", "Count": "G", "Percentage": "F"}
+LEVEL_ROWS = [24, 28, 32, 36, 40]
+LEVEL_COLS = {"Level_str": "D", "Level_int": "F", "Count": "G", "Percentage": "F"}
+COUNT_CELLS = [LEVEL_COLS["Count"] + f"{row}" for row in LEVEL_ROWS]
+LEVEL_CELL = LEVEL_COLS["Level_str"] + f"{LEVEL_ROWS[0]}"
+FORM_CELLS = [*METADATA.values(), *COUNT_CELLS, LEVEL_CELL]  # all cells that are read
+
+XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+class FastReadError(Exception):
+    """The xlsx uses a feature that read_cells_xml does not handle."""
+
+
+def read_cells(sheet, refs):
+    """Return {ref: value} for the given cell references, reading the sheet's rows once."""
+    coords = {ref: coordinate_from_string(ref) for ref in refs}
+    max_row = max(row for _, row in coords.values())
+    max_col = max(column_index_from_string(col) for col, _ in coords.values())
+    grid = list(
+        sheet.iter_rows(min_row=1, max_row=max_row, max_col=max_col, values_only=True)
+    )
+    values = {}
+    for ref, (col, row) in coords.items():
+        cells = grid[row - 1] if row <= len(grid) else ()
+        col = column_index_from_string(col)
+        values[ref] = cells[col - 1] if col <= len(cells) else None
+    return values
+
+
+def read_cells_openpyxl(full_path, sheet_name, refs):
+    """Return {ref: value} for cells of the named sheet, via openpyxl."""
+    # read_only streams the sheet XML; values, not formulas
+    workbook = openpyxl.load_workbook(full_path, read_only=True, data_only=True)
+    try:
+        return read_cells(workbook[sheet_name], refs)
+    finally:
+        workbook.close()
+
+
+def xlsx_sheet_part(archive, sheet_name):
+    """Return (zip member name of the named worksheet, whether dates use 1904 epoch)."""
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    pr = workbook.find(f"{XLSX_NS}workbookPr")
+    date1904 = pr is not None and pr.get("date1904") in ("1", "true")
+    sheets = {
+        sheet.get("name"): sheet.get(f"{DOC_REL_NS}id")
+        for sheet in workbook.iter(f"{XLSX_NS}sheet")
+    }
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {
+        rel.get("Id"): rel.get("Target")
+        for rel in rels.iter(f"{PKG_REL_NS}Relationship")
+    }
+    target = targets[sheets[sheet_name]]
+    if target.startswith("/"):
+        return target[1:], date1904
+    return posixpath.normpath(posixpath.join("xl", target)), date1904
+
+
+def xlsx_shared_strings(archive, indices):
+    """Return {index: text} for just the needed shared strings, stream-parsed."""
+    strings = {}
+    if not indices:
+        return strings
+    with archive.open("xl/sharedStrings.xml") as fileobj:
+        i = 0
+        for _, elem in ET.iterparse(fileobj):
+            if elem.tag == f"{XLSX_NS}si":
+                if i in indices:
+                    phonetic = {
+                        t for r in elem.iter(f"{XLSX_NS}rPh") for t in r.iter()
+                    }  # reading hints, not part of the value
+                    strings[i] = "".join(
+                        t.text or ""
+                        for t in elem.iter(f"{XLSX_NS}t")
+                        if t not in phonetic
+                    )
+                    if len(strings) == len(indices):
+                        break
+                elem.clear()
+                i += 1
+    return strings
+
+
+def xlsx_date_styles(archive):
+    """Return {style index: "date" | "timedelta"} for cell styles with those formats."""
+    styles = ET.fromstring(archive.read("xl/styles.xml"))
+    formats = dict(BUILTIN_FORMATS)
+    for fmt in styles.iter(f"{XLSX_NS}numFmt"):
+        formats[int(fmt.get("numFmtId"))] = fmt.get("formatCode")
+    kinds = {}
+    xfs = styles.find(f"{XLSX_NS}cellXfs")
+    for i, xf in enumerate(xfs if xfs is not None else ()):
+        code = formats.get(int(xf.get("numFmtId", 0)), "General")
+        if is_timedelta_format(code):
+            kinds[i] = "timedelta"
+        elif is_date_format(code):
+            kinds[i] = "date"
+    return kinds
+
+
+def xlsx_raw_cells(fileobj, refs):
+    """
+    Return {ref: (type, <v> text, inline text, style index)} for cells in refs.
+
+    The worksheet XML is stream-parsed only up to the last wanted row.
+    """
+    wanted = set(refs)
+    max_row = max(row for _, row in map(coordinate_from_string, refs))
+    raw = {}
+    for _, elem in ET.iterparse(fileobj):
+        if elem.tag == f"{XLSX_NS}c":
+            ref = elem.get("r")
+            if ref is None:
+                raise FastReadError("cell without reference")
+            if ref in wanted:
+                kind, v = elem.get("t", "n"), elem.find(f"{XLSX_NS}v")
+                raw[ref] = (
+                    kind,
+                    v.text if v is not None else None,
+                    (
+                        "".join(t.text or "" for t in elem.iter(f"{XLSX_NS}t"))
+                        if kind == "inlineStr"
+                        else None
+                    ),
+                    int(elem.get("s", 0)),
+                )
+        elif elem.tag == f"{XLSX_NS}row":
+            if int(elem.get("r", 0)) >= max_row:
+                break
+            elem.clear()
+    return raw
 
-    workbook = openpyxl.load_workbook(full_path, data_only=True)  # values, not formulas
-    sheet = workbook["Form"]
+
+def read_cells_xml(full_path, sheet_name, refs):
+    """
+    Return {ref: value} for cells of the named sheet, parsing only the XML needed.
+
+    The worksheet is stream-parsed from the zip only up to the last wanted row,
+    and only the referenced shared strings are extracted. Values match openpyxl's
+    data_only values; FastReadError is raised for cases not handled here.
+    """
+    with zipfile.ZipFile(full_path) as archive:
+        part, date1904 = xlsx_sheet_part(archive, sheet_name)
+        with archive.open(part) as fileobj:
+            raw = xlsx_raw_cells(fileobj, refs)
+
+        strings = xlsx_shared_strings(
+            archive, {int(v) for t, v, _, _ in raw.values() if t == "s"}
+        )
+        styled = any(t == "n" and v is not None and s for t, v, _, s in raw.values())
+        date_styles = xlsx_date_styles(archive) if styled else {}
+
+    values = dict.fromkeys(refs)
+    for ref, cell in raw.items():
+        values[ref] = xlsx_cell_value(cell, strings, date_styles, date1904)
+    return values
+
+
+def xlsx_cell_value(cell, strings, date_styles, date1904):
+    """
+    Return a cell's value given its (type, <v> text, inline text, style index).
+
+    strings and date_styles are from xlsx_shared_strings and xlsx_date_styles.
+    """
+    kind, v, inline, style = cell
+    if kind == "inlineStr":
+        return inline
+    if v is None:
+        return None
+    if kind == "s":
+        return strings[int(v)]
+    if kind in ("str", "e"):
+        return v
+    if kind == "b":
+        return bool(int(v))
+    if kind != "n":
+        raise FastReadError(f"cell type {kind}")
+    number = float(v) if any(c in v for c in ".Ee") else int(v)
+    if date_styles.get(style) == "timedelta":
+        raise FastReadError("time interval cell")
+    if date_styles.get(style) == "date":
+        number = from_excel(number, MAC_EPOCH if date1904 else WINDOWS_EPOCH)
+    return number
+
+
+def form_data(cells):
+    """Return SO data values given {ref: value} for FORM_CELLS."""
     assert (
-        sheet[level_cols["Level_str"] + f"{level_rows[0]}"].value == LEVEL[0]
+        cells[LEVEL_CELL] == LEVEL[0]
     ), "Unexpected format: did not find highest level description where expected"
 
     data_values = []
     for field, cell in METADATA.items():
-        value = sheet[cell].value
+        value = cells[cell]
         if field == "Outcome":
             for pattern in OUTCOME_NUMBER:
                 if result := pattern.match(value):
@@ -65,38 +257,203 @@ def get_so_data(full_path):
                     break
         data_values.append(value)
 
-    for row in level_rows:
-        data_values.append(sheet[level_cols["Count"] + f"{row}"].value)
+    for cell in COUNT_CELLS:
+        data_values.append(cells[cell])
 
     return data_values
 
 
-def main(args):
-    """Summarize MSOE EECS SO XLSX files recursively."""
-    all_data = []
-    assert args.program in PROGRAM, f"Program code {args.program} is not recognized"
-    assert (
-        1980 < args.year < 2999
-    ), f"Academic year ({args.year}) must be in 4-digit format"
-    for dirpath, _, filenames in os.walk(
-        os.path.join(args.directory, args.program, str(args.year))
+def get_so_data(full_path):
+    """
+    Read summary SO assessment data from the given XLSX file.
+
+    The needed cells are pulled straight from the sheet XML; openpyxl is used
+    instead if that fails or the layout check does not pass.
+    """
+    try:
+        return form_data(read_cells_xml(full_path, "Form", FORM_CELLS))
+    except (
+        AssertionError,
+        FastReadError,
+        KeyError,
+        ValueError,
+        TypeError,
+        zipfile.BadZipFile,
+        ET.ParseError,
     ):
-        for filename in filenames:
-            if filename.endswith(".xlsx"):
-                full_path = os.path.join(dirpath, filename)
-                print(full_path)
-                all_data.append(get_so_data(full_path))
+        return form_data(read_cells_openpyxl(full_path, "Form", FORM_CELLS))
+
+
+MANIFEST_VERSION = 2  # bump whenever get_so_data's output or its encoding changes
+TAGGED_TYPES = {"datetime": datetime, "date": date, "time": time}
+
+
+def encode_value(value):
+    """JSON default tagging dates, times, and durations so decode_value restores them."""
+    if isinstance(value, timedelta):
+        return {"__type__": "timedelta", "value": value.total_seconds()}
+    for tag, cls in TAGGED_TYPES.items():  # datetime first, as it subclasses date
+        if isinstance(value, cls):
+            return {"__type__": tag, "value": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def decode_value(obj):
+    """JSON object_hook restoring the values tagged by encode_value."""
+    if obj.keys() != {"__type__", "value"}:
+        return obj
+    if obj["__type__"] == "timedelta":
+        return timedelta(seconds=obj["value"])
+    return TAGGED_TYPES[obj["__type__"]].fromisoformat(obj["value"])
 
+
+def manifest_path():
+    """Return path of the manifest caching get_so_data results by file path and mtime."""
+    return os.path.join(get_cache_dir("so"), f"manifest-v{MANIFEST_VERSION}.json")
+
+
+def load_manifest():
+    """Return {path: {"mtime_ns", "size", "data"}} from the manifest, empty if absent."""
+    try:
+        with open(manifest_path(), "r", encoding="utf-8") as fileobj:
+            return json.load(fileobj, object_hook=decode_value)
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def save_manifest(manifest):
+    """Atomically replace the manifest."""
+    tmp_path = f"{manifest_path()}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fileobj:
+        json.dump(manifest, fileobj, default=encode_value)
+    os.replace(tmp_path, manifest_path())
+
+
+def map_forms(func, paths, workers=None):
+    """Yield func(path) for each path, in order, using a process pool unless workers is 1."""
+    if workers == 1 or len(paths) <= 1:
+        yield from map(func, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(func, paths, chunksize=4)
+
+
+@profiled("harvest")
+def harvest(paths, workers=None, refresh=False):
+    """
+    Return get_so_data for each path, in order, reparsing only new or changed forms.
+
+    Forms are parsed in a pool of worker processes; unchanged forms (same path,
+    size, and mtime as in the manifest) are not opened at all unless refresh.
+    """
+    manifest = {} if refresh else load_manifest()
+    stats, stale = {}, []
+    for pth in paths:
+        st = os.stat(pth)
+        stats[pth] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        cached = manifest.get(pth, {})
+        if any(cached.get(k) != v for k, v in stats[pth].items()):
+            stale.append(pth)
+    print(f"{len(paths) - len(stale)} unchanged forms, {len(stale)} to read")
+    stagetimer.add(
+        "harvest",
+        files=len(stale),
+        bytes=sum(stats[p]["size"] for p in stale),
+        hits=len(paths) - len(stale),
+        misses=len(stale),
+    )
+
+    if stale:
+        try:
+            for pth, data in zip(stale, map_forms(get_so_data, stale, workers)):
+                print(pth)
+                manifest[pth] = {**stats[pth], "data": data}
+        finally:  # keep progress even if a form fails
+            save_manifest(manifest)
+
+    return [manifest[p]["data"] for p in paths]
+
+
+def parse_years(specs):
+    """Return sorted academic years given specs like "2020" or "2020-2025" (inclusive)."""
+    years = set()
+    for spec in specs:
+        first, _, last = str(spec).partition("-")
+        years.update(range(int(first), int(last or first) + 1))
+    for year in years:
+        assert 1980 < year < 2999, f"Academic year ({year}) must be in 4-digit format"
+    return sorted(years)
+
+
+@profiled("find_forms")
+def find_forms(directory, programs, years):
+    """Return [(program, year, path)] for every SO form below directory/program/year."""
+    forms = []
+    for program in programs:
+        for year in years:
+            for dirpath, _, filenames in os.walk(
+                os.path.join(directory, program, str(year))
+            ):
+                for filename in filenames:
+                    if filename.endswith(".xlsx"):
+                        forms.append((program, year, os.path.join(dirpath, filename)))
+    return forms
+
+
+@profiled("summarize")
+def summarize(forms, all_data):
+    """
+    Return (per-form DataFrame, per-outcome DataFrame) given find_forms and harvest output.
+
+    Forms are ordered by program, year, outcome, course number, and section, with
+    N≥Proficient and N counts; outcomes aggregate those counts per program and year.
+    """
     col_names = list(METADATA.keys())
     col_names.extend(LEVEL)
 
     dataframe = pd.DataFrame(all_data, columns=col_names)
-    dataframe.to_excel(TIME_TAG + ".xlsx")
+    dataframe.insert(0, "Program Code", [program for program, _, _ in forms])
+    dataframe.insert(1, "AY", [year for _, year, _ in forms])
+    counts = dataframe[LEVEL].apply(pd.to_numeric, errors="coerce").fillna(0)
+    dataframe["N≥Proficient"] = counts[LEVEL[: LEVEL.index("Proficient") + 1]].sum(
+        axis=1
+    )
+    dataframe["N"] = counts.sum(axis=1)
+    dataframe = dataframe.sort_values(
+        ["Program Code", "AY", "Outcome", "Course Number", "Section"],
+        key=lambda col: col.astype(str) if col.dtype == object else col,
+        ignore_index=True,
+    )
 
+    outcomes = (
+        dataframe.groupby(["Program Code", "AY", "Outcome"], sort=False)[
+            ["N≥Proficient", "N"]
+        ]
+        .sum()
+        .reset_index()
+    )
+    outcomes["Percent Proficient"] = outcomes["N≥Proficient"] / outcomes["N"]
+    return dataframe, outcomes
+
+
+def main(args):
+    """Summarize MSOE EECS SO XLSX files recursively."""
+    programs = sorted(PROGRAM) if "all" in args.program else args.program
+    for program in programs:
+        assert program in PROGRAM, f"Program code {program} is not recognized"
+    forms = find_forms(args.directory, programs, parse_years(args.year))
+    all_data = harvest(
+        [pth for _, _, pth in forms], workers=args.workers, refresh=args.refresh
+    )
+
+    dataframe, outcomes = summarize(forms, all_data)
+    with pd.ExcelWriter(TIME_TAG + ".xlsx") as writer:
+        dataframe.to_excel(writer, sheet_name="Forms")
+        outcomes.to_excel(writer, sheet_name="Outcomes", index=False)
 
-if __name__ == "__main__":
-    # execute only if run as a script
 
+def cli():
+    """Parse command line arguments and run main, timing stages if requested."""
     assessment_path = [
         "Box",
         "EECS Faculty and Staff",
@@ -108,10 +465,20 @@ if __name__ == "__main__":
         description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
     parser.add_argument(
-        "-p", "--program", type=str, default="CE", help="Academic program code"
+        "-p",
+        "--program",
+        type=str,
+        nargs="+",
+        default=["CE"],
+        help="Academic program codes, or all",
     )
     parser.add_argument(
-        "-y", "--year", type=int, default=2020, help="4-digit academic year"
+        "-y",
+        "--year",
+        type=str,
+        nargs="+",
+        default=["2020"],
+        help="4-digit academic years or ranges (e.g., 2019-2024)",
     )
     parser.add_argument(
         "-d",
@@ -120,4 +487,25 @@ if __name__ == "__main__":
         default=os.path.join(os.path.expanduser("~"), *assessment_path),
         help="Directory to analyze",
     )
-    main(parser.parse_args())
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes reading forms (default: one per CPU)",
+    )
+    parser.add_argument(
+        "-r",
+        "--refresh",
+        action="store_true",
+        help="Reread every form instead of reusing unchanged results",
+    )
+    stagetimer.add_profile_argument(parser)
+    args = parser.parse_args()
+    with stagetimer.session(args.profile):
+        return main(args)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    cli()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Opt-in per-stage wall time and I/O counters shared by these scripts."""
+
+import os
+import sys
+import json
+import time
+import threading
+import functools
+import contextlib
+from datetime import datetime
+
+ENV_VAR = "MSOE_PROFILE"  # 1 to profile; a path ending in .json also dumps there
+
+_lock = threading.Lock()
+_stages = {}
+_ENABLED = False
+
+
+def enabled():
+    """Return whether stages are being recorded."""
+    return _ENABLED
+
+
+def add(name, **counts):
+    """Add counts (e.g., calls, seconds, files, bytes, hits, misses) to a stage."""
+    if not _ENABLED:
+        return
+    with _lock:
+        record = _stages.setdefault(name, {})
+        for key, value in counts.items():
+            record[key] = record.get(key, 0) + value
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Time the enclosed block as one call of the named stage."""
+    if not _ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, calls=1, seconds=time.perf_counter() - start)
+
+
+def profiled(name):
+    """Decorator recording each call of the function as the named stage."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def summary():
+    """Return {stage: counters} recorded so far, in first-recorded order."""
+    with _lock:
+        return {name: dict(record) for name, record in _stages.items()}
+
+
+def print_summary(file=sys.stderr):
+    """Print a table of the recorded stages."""
+    print(
+        f"{'Stage':<24}{'Calls':>7}{'Seconds':>10}{'Files':>7}{'MiB':>9}"
+        f"{'Hits':>7}{'Misses':>7}",
+        file=file,
+    )
+    for name, record in summary().items():
+        print(
+            f"{name:<24}{record.get('calls', 0):>7}{record.get('seconds', 0):>10.3f}"
+            f"{record.get('files', 0):>7}{record.get('bytes', 0) / 2**20:>9.2f}"
+            f"{record.get('hits', 0):>7}{record.get('misses', 0):>7}",
+            file=file,
+        )
+    print(
+        "Seconds are summed over threads; enclosing stages include nested ones.",
+        file=file,
+    )
+
+
+def dump(fn):
+    """Append the recorded stages to a JSON file as one run, for trend tracking."""
+    runs = []
+    with contextlib.suppress(OSError, ValueError):
+        with open(fn, encoding="utf-8") as file:
+            runs = json.load(file)
+    runs.append(
+        {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "argv": sys.argv,
+            "stages": summary(),
+        }
+    )
+    with open(fn + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(runs, file, indent=1)
+    os.replace(fn + ".tmp", fn)
+
+
+@contextlib.contextmanager
+def session(option=None):
+    """
+    Record stages in the enclosed block when option or MSOE_PROFILE asks for it.
+
+    option is the value of a --profile argument: None when absent, "" when given
+    bare, or a JSON path to dump to. The summary prints even if the block raises.
+    """
+    global _ENABLED  # pylint: disable=global-statement
+    if option is None:
+        option = os.environ.get(ENV_VAR) or None
+    if option is None or option == "0":
+        yield
+        return
+    _ENABLED = True
+    try:
+        yield
+    finally:
+        _ENABLED = False
+        print_summary()
+        if option.lower().endswith(".json"):
+            dump(option)
+            print(f"Profile appended to {option}", file=sys.stderr)
+
+
+def add_profile_argument(parser):
+    """Add the shared --profile option to an argparse parser."""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="JSON",
+        help=f"Print per-stage times and I/O counts (also {ENV_VAR}=1); "
+        "append them to JSON if given",
+    )